@@ -0,0 +1,6 @@
+"""
+Benchmarks for utility, run as modules from the repository root.
+
+    $ python -m benchmark [--quick] [--output FILE]
+    $ python -m benchmark.<name>
+"""
@@ -0,0 +1,196 @@
+"""
+The cache benchmark suite: get/set throughput, key construction,
+generator replay, multi-consumer replay and eviction cost, over Zipf,
+uniform and scan workloads.
+
+    $ python -m benchmark [--quick] [--output FILE]
+
+A table is printed to stderr, and the results are written as JSON to
+FILE, or to stdout, so that runs can be compared between commits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import timeit
+
+import utility
+from utility.cache import _make_key
+
+from .key import CASES
+from .workload import workloads
+
+
+MAX_SIZE = 1_000
+
+
+CLASSES = {
+    "LRUCache": lambda: utility.LRUCache(max_size=MAX_SIZE),
+    "LFUCache": lambda: utility.LFUCache(max_size=MAX_SIZE),
+    "TinyLFUCache": lambda: utility.TinyLFUCache(max_size=MAX_SIZE),
+    "TTLCache": lambda: utility.TTLCache(max_size=MAX_SIZE, ttl=3600),
+    "ConcurrentLRUCache": lambda: utility.ConcurrentLRUCache(max_size=MAX_SIZE),
+}
+
+
+def bench_get_set(traces):
+    for workload, trace in traces.items():
+        for name, factory in CLASSES.items():
+            cache = factory()
+
+            start = time.perf_counter()
+
+            for key in trace:
+                if cache.get(key) is None:
+                    cache[key] = key
+
+            elapsed = time.perf_counter() - start
+
+            yield {"class": name, "workload": workload, "ops_per_second": len(trace) / elapsed, "hit_ratio": cache.hits / len(trace)}
+
+
+def bench_eviction(traces):
+    length = len(next(iter(traces.values())))
+
+    for name, factory in CLASSES.items():
+        cache = factory()
+
+        for key in range(MAX_SIZE):
+            cache[key] = key
+
+        # NOTE: every key is new, so every set evicts
+        keys = range(MAX_SIZE, MAX_SIZE + length)
+
+        start = time.perf_counter()
+
+        for key in keys:
+            cache[key] = key
+
+        elapsed = time.perf_counter() - start
+
+        yield {"class": name, "ns_per_set": elapsed / length * 1e9}
+
+
+def bench_key(traces):
+    number = len(next(iter(traces.values())))
+
+    for case, (args, kwargs) in CASES.items():
+        for typed in (False, True):
+            elapsed = timeit.timeit(lambda: _make_key(args, kwargs, typed), number=number)
+
+            yield {"call": case, "typed": typed, "ns_per_key": elapsed / number * 1e9}
+
+
+REPLAY_OPTIONS = {
+    "list": {},
+    "chunked": {"chunk_size": 4096},
+    "array": {"chunk_size": 4096, "typecode": "q"},
+}
+
+
+def bench_replay(traces):
+    items = len(next(iter(traces.values())))
+
+    for name, options in REPLAY_OPTIONS.items():
+
+        @utility.cache_generator(**options)
+        def generate(count):
+            yield from range(count)
+
+        for _ in generate(items):
+            pass
+
+        start = time.perf_counter()
+
+        for _ in generate(items):
+            pass
+
+        elapsed = time.perf_counter() - start
+
+        yield {"buffer": name, "items_per_second": items / elapsed}
+
+
+def bench_multi_consumer(traces):
+    items = len(next(iter(traces.values()))) // 10
+
+    for consumers in (1, 4, 16):
+        for name, options in REPLAY_OPTIONS.items():
+
+            @utility.cache_generator(**options)
+            def generate(count):
+                yield from range(count)
+
+            # NOTE: consumers advance in lockstep, so the first one
+            #       drives the shared generator and the rest replay
+            iterators = [generate(items) for _ in range(consumers)]
+
+            start = time.perf_counter()
+
+            for _ in range(items):
+                for iterator in iterators:
+                    next(iterator)
+
+            elapsed = time.perf_counter() - start
+
+            yield {"buffer": name, "consumers": consumers, "items_per_second": items * consumers / elapsed}
+
+
+BENCHMARKS = {
+    "get_set": bench_get_set,
+    "eviction": bench_eviction,
+    "key": bench_key,
+    "replay": bench_replay,
+    "multi_consumer": bench_multi_consumer,
+}
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmark")
+    parser.add_argument("--quick", action="store_true", help="use shorter traces")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--only", action="append", choices=list(BENCHMARKS), help="run only this benchmark, may be repeated")
+    arguments = parser.parse_args(argv)
+
+    length = 50_000 if arguments.quick else 500_000
+    traces = workloads(length, 100_000)
+
+    results = {
+        "commit": _commit(),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "length": length,
+        "benchmarks": dict(),
+    }
+
+    for name in arguments.only or BENCHMARKS:
+        print(name, file=sys.stderr)
+
+        rows = results["benchmarks"][name] = list()
+
+        for row in BENCHMARKS[name](traces):
+            rows.append(row)
+            print("    " + "  ".join(f"{key}={value:,.2f}" if isinstance(value, float) else f"{key}={value}" for key, value in row.items()), file=sys.stderr)
+
+    if arguments.output:
+        with open(arguments.output, "w") as stream:
+            json.dump(results, stream, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,79 @@
+"""
+Multi-threaded throughput of the shared and sharded cache classes.
+
+    $ python -m benchmark.concurrent
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import threading
+import time
+
+import utility
+
+
+OPERATIONS = 200_000
+KEYS = 10_000
+MAX_SIZE = 1_000
+
+
+def _worker(cache, keys, barrier):
+    barrier.wait()
+
+    for key in keys:
+        try:
+            cache[key]
+        except KeyError:
+            cache[key] = key
+
+
+def run(factory, threads):
+    cache = factory()
+
+    rng = random.Random(0)
+    per_thread = OPERATIONS // threads
+    keys = [[int(rng.paretovariate(1.2)) % KEYS for _ in range(per_thread)] for _ in range(threads)]
+
+    barrier = threading.Barrier(threads + 1)
+    workers = [threading.Thread(target=_worker, args=(cache, keys[i], barrier)) for i in range(threads)]
+
+    for worker in workers:
+        worker.start()
+
+    barrier.wait()
+    start = time.perf_counter()
+
+    for worker in workers:
+        worker.join()
+
+    elapsed = time.perf_counter() - start
+
+    return per_thread * threads / elapsed, cache.hits, cache.misses
+
+
+def main():
+    factories = {
+        "Cache": lambda: utility.Cache(),
+        "ConcurrentCache": lambda: utility.ConcurrentCache(),
+        "LRUCache": lambda: utility.LRUCache(max_size=MAX_SIZE),
+        "ConcurrentLRUCache": lambda: utility.ConcurrentLRUCache(max_size=MAX_SIZE),
+    }
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"python {sys.version.split()[0]}, gil {'enabled' if gil else 'disabled'}")
+    print(f"{'class':<20} {'threads':>7} {'ops/s':>12} {'hits+misses':>12}")
+
+    for threads in (1, 2, 4, 8):
+        for name, factory in factories.items():
+            try:
+                throughput, hits, misses = run(factory, threads)
+            except Exception as e:
+                print(f"{name:<20} {threads:>7} {'failed':>12} {type(e).__name__}")
+            else:
+                print(f"{name:<20} {threads:>7} {throughput:>12,.0f} {hits + misses:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Per-call key construction cost of cache_generator.
+
+    $ python -m benchmark.key
+"""
+
+from __future__ import annotations
+
+import timeit
+
+from utility.cache import _make_key
+
+
+def _make_key_hash(args, kwargs):
+    # NOTE: the key builder prior to flattened tuple keys, for comparison
+    return hash((args, frozenset(kwargs.items())))
+
+
+CASES = {
+    "f(1)": ((1,), {}),
+    "f('a')": (("a",), {}),
+    "f(1, 2, 3)": ((1, 2, 3), {}),
+    "f(a=1)": ((), {"a": 1}),
+    "f(1, b=2, c=3)": ((1,), {"b": 2, "c": 3}),
+}
+
+NUMBER = 500_000
+
+
+def _lookup(make_key, args, kwargs):
+    # NOTE: a hit in LRUCache hashes the key twice, once for the lookup
+    #       and once for move_to_end, so this is the cost that matters
+    cache = {make_key(args, kwargs): None}
+
+    def run():
+        key = make_key(args, kwargs)
+        cache[key]
+        cache[key]
+
+    return run
+
+
+def main():
+    print(f"{'call':<16} {'old key':>10} {'new key':>10} {'typed key':>10} {'old hit':>10} {'new hit':>10}")
+
+    for name, (args, kwargs) in CASES.items():
+        timings = [
+            timeit.timeit(lambda: _make_key_hash(args, kwargs), number=NUMBER),
+            timeit.timeit(lambda: _make_key(args, kwargs), number=NUMBER),
+            timeit.timeit(lambda: _make_key(args, kwargs, True), number=NUMBER),
+            timeit.timeit(_lookup(_make_key_hash, args, kwargs), number=NUMBER),
+            timeit.timeit(_lookup(_make_key, args, kwargs), number=NUMBER),
+        ]
+
+        print(f"{name:<16}" + "".join(f" {timing / NUMBER * 1e9:>8.1f}ns" for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Throughput, accuracy and CPU time of the limiters with many waiting
+tasks, against a limiter which polls with asyncio.sleep.
+
+    $ python -m benchmark.limiter [TASKS] [RATE]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+
+import utility
+
+
+class PollingLimiter:
+    # NOTE: stands in for the sleep loops this replaces
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+
+    async def __aenter__(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(1.0, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    async def __aexit__(self, *args):
+        pass
+
+
+async def waiter(limiter):
+    async with limiter:
+        pass
+
+
+async def run(limiter, count):
+    await asyncio.gather(*(waiter(limiter) for _ in range(count)))
+
+
+def main(count, rate):
+    cases = {
+        "polling": lambda: PollingLimiter(rate),
+        "token bucket": lambda: utility.TokenBucketLimiter(rate=rate),
+        "sliding window": lambda: utility.SlidingWindowLimiter(max_calls=max(1, int(rate // 100)), period=0.01),
+    }
+
+    print(f"{count:,} tasks at {rate:,.0f}/s, ideally {count / rate:.2f}s")
+    print(f"{'limiter':<16} {'calls/s':>10} {'elapsed':>9} {'cpu':>9}")
+
+    for name, factory in cases.items():
+        limiter = factory()
+
+        start = time.perf_counter()
+        cpu = time.process_time()
+
+        asyncio.run(run(limiter, count))
+
+        cpu = time.process_time() - cpu
+        elapsed = time.perf_counter() - start
+
+        print(f"{name:<16} {count / elapsed:>10,.0f} {elapsed:>8.2f}s {cpu:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000, float(sys.argv[2]) if len(sys.argv) > 2 else 5_000)
@@ -0,0 +1,70 @@
+"""
+Resident memory over many short-lived instances with a cached method,
+per-instance with cache_method against a global cache_generator, on
+Linux.
+
+    $ python -m benchmark.method [INSTANCES]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+import utility
+
+
+def rss():
+    with open("/proc/self/statm") as stream:
+        return int(stream.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class PerInstance:
+    def __init__(self, n):
+        self.n = n
+        self.payload = bytes(256)
+
+    @utility.cache_method(wrapper=list)
+    def items(self, count):
+        yield from range(self.n, self.n + count)
+
+
+class Global:
+    def __init__(self, n):
+        self.n = n
+        self.payload = bytes(256)
+
+    @utility.cache_generator(max_size=None, wrapper=list)
+    def items(self, count):
+        yield from range(self.n, self.n + count)
+
+
+def run(cls, instances):
+    samples = list()
+    start = time.perf_counter()
+
+    for i in range(instances):
+        instance = cls(i)
+        instance.items(8)
+        instance.items(8)
+
+        if i % (instances // 5) == 0:
+            samples.append(rss())
+
+    samples.append(rss())
+
+    return instances / (time.perf_counter() - start), samples
+
+
+def main(instances):
+    print(f"{instances:,} instances, 2 calls each")
+    print(f"{'class':<12} {'instances/s':>12}  rss samples (MiB)")
+
+    for cls in (PerInstance, Global):
+        throughput, samples = run(cls, instances)
+        print(f"{cls.__name__:<12} {throughput:>12,.0f}  " + " ".join(f"{sample / 2**20:.0f}" for sample in samples))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,67 @@
+"""
+Hit ratio and throughput of the cache policies over key traces.
+
+    $ python -m benchmark.replay [TRACE ...]
+
+Each TRACE is a file with one key per line. Without any, synthetic Zipf
+traces with and without periodic scans are generated.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+import utility
+
+from .workload import zipf, zipf_with_scans
+
+
+MAX_SIZE = 1_000
+
+
+def run(factory, trace):
+    cache = factory()
+
+    start = time.perf_counter()
+
+    for key in trace:
+        try:
+            cache[key]
+        except KeyError:
+            cache[key] = key
+
+    elapsed = time.perf_counter() - start
+
+    return cache.hits / len(trace), len(trace) / elapsed
+
+
+def main(paths):
+    if paths:
+        traces = dict()
+
+        for path in paths:
+            with open(path) as stream:
+                traces[path] = [line.rstrip("\n") for line in stream]
+    else:
+        traces = {
+            "zipf": zipf(500_000, 100_000),
+            "zipf+scan": zipf_with_scans(500_000, 100_000),
+        }
+
+    factories = {
+        "LRUCache": lambda: utility.LRUCache(max_size=MAX_SIZE),
+        "LFUCache": lambda: utility.LFUCache(max_size=MAX_SIZE),
+        "TinyLFUCache": lambda: utility.TinyLFUCache(max_size=MAX_SIZE),
+    }
+
+    print(f"{'trace':<12} {'class':<14} {'hit ratio':>9} {'ops/s':>12}")
+
+    for trace_name, trace in traces.items():
+        for name, factory in factories.items():
+            ratio, throughput = run(factory, trace)
+            print(f"{trace_name:<12} {name:<14} {ratio:>9.2%} {throughput:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,122 @@
+"""
+Multi-process throughput and memory of SharedMemoryCache against one
+LRUCache per process, on Linux.
+
+    $ python -m benchmark.shared [PROCESSES]
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import random
+import resource
+import sys
+import time
+
+import utility
+
+
+ENTRIES = 50_000
+OPERATIONS = 200_000
+WRITES = 0.1
+
+
+def value(key):
+    # NOTE: stands in for a row of reference data
+    return {"id": key, "name": f"entry-{key}", "tags": ["a", "b", "c"], "score": key / 7}
+
+
+def _keys(seed):
+    rng = random.Random(seed)
+
+    return [(rng.randrange(ENTRIES), rng.random() < WRITES) for _ in range(OPERATIONS)]
+
+
+def _shared_worker(cache, seed, barrier, results):
+    operations = _keys(seed)
+
+    barrier.wait()
+    start = time.perf_counter()
+
+    for key, write in operations:
+        if write:
+            cache[key] = value(key)
+        else:
+            cache[key]
+
+    results.put((time.perf_counter() - start, 0.0, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def _local_worker(seed, barrier, results):
+    operations = _keys(seed)
+
+    # NOTE: every process builds its own copy of the reference data
+    start = time.perf_counter()
+    cache = utility.LRUCache(max_size=ENTRIES)
+
+    for key in range(ENTRIES):
+        cache[key] = value(key)
+
+    build = time.perf_counter() - start
+
+    barrier.wait()
+    start = time.perf_counter()
+
+    for key, write in operations:
+        if write:
+            cache[key] = value(key)
+        else:
+            cache[key]
+
+    results.put((time.perf_counter() - start, build, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def run(target, args, processes):
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(processes)
+    results = context.Queue()
+
+    workers = [context.Process(target=target, args=(*args, seed, barrier, results)) for seed in range(processes)]
+
+    for worker in workers:
+        worker.start()
+
+    timings = [results.get() for _ in workers]
+
+    for worker in workers:
+        worker.join()
+
+    elapsed = max(timing for timing, _, _ in timings)
+    build = max(build for _, build, _ in timings)
+    rss = sum(rss for _, _, rss in timings)
+
+    return OPERATIONS * processes / elapsed, build, rss
+
+
+def main(processes):
+    shared = utility.SharedMemoryCache(size=256 * 1024 * 1024, slots=1 << 17)
+
+    start = time.perf_counter()
+
+    for key in range(ENTRIES):
+        shared[key] = value(key)
+
+    build = time.perf_counter() - start
+
+    print(f"{processes} processes, {ENTRIES:,} entries, {WRITES:.0%} writes")
+    print(f"{'class':<20} {'ops/s':>12} {'build':>10} {'max rss sum':>14}")
+
+    try:
+        throughput, _, rss = run(_shared_worker, (shared,), processes)
+        print(f"{'SharedMemoryCache':<20} {throughput:>12,.0f} {build * 1e3:>8.1f}ms {rss:>12,}kB")
+        print(f"{'':<20} {'':>12} {'':>10} {shared.arena_used // 1024:>12,}kB arena")
+
+        throughput, build, rss = run(_local_worker, (), processes)
+        print(f"{'LRUCache':<20} {throughput:>12,.0f} {build * 1e3:>8.1f}ms {rss:>12,}kB")
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4)
@@ -0,0 +1,66 @@
+"""
+Warm-start latency of Cache.restore against recomputing every entry.
+
+    $ python -m benchmark.snapshot
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import time
+
+import utility
+
+
+ENTRIES = 20_000
+ROUNDS = 200
+
+
+def compute(key):
+    # NOTE: stands in for an expensive lookup
+    digest = str(key).encode()
+
+    for _ in range(ROUNDS):
+        digest = hashlib.sha256(digest).digest()
+
+    return [digest.hex()] * 4
+
+
+def main():
+    cache = utility.LRUCache(max_size=ENTRIES)
+
+    start = time.perf_counter()
+
+    for key in range(ENTRIES):
+        cache[key] = compute(key)
+
+    recompute = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cache.bin")
+
+        start = time.perf_counter()
+        cache.snapshot(path)
+        snapshot = time.perf_counter() - start
+
+        size = os.path.getsize(path)
+
+        restored = utility.LRUCache(max_size=ENTRIES)
+
+        start = time.perf_counter()
+        restored.restore(path)
+        restore = time.perf_counter() - start
+
+    assert list(restored._cache.items()) == list(cache._cache.items())
+
+    print(f"entries    {ENTRIES:>12,}")
+    print(f"file size  {size:>12,} bytes")
+    print(f"recompute  {recompute * 1e3:>12.1f} ms")
+    print(f"snapshot   {snapshot * 1e3:>12.1f} ms")
+    print(f"restore    {restore * 1e3:>12.1f} ms ({recompute / restore:.1f}x faster than recompute)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Peak memory and throughput of wait_or_raise against
+wait_or_raise_bounded over many awaitables.
+
+    $ python -m benchmark.wait [AWAITABLES]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+import tracemalloc
+
+import utility
+
+
+async def job(i):
+    # NOTE: stands in for a request holding a buffer while in flight
+    buffer = bytearray(1024)
+    await asyncio.sleep(0.001)
+
+    return len(buffer) + i
+
+
+def run(factory):
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    asyncio.run(factory())
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main(count):
+    cases = {
+        "wait_or_raise": lambda: utility.wait_or_raise([job(i) for i in range(count)]),
+        "bounded 100": lambda: utility.wait_or_raise_bounded((job(i) for i in range(count)), limit=100),
+        "bounded 1000": lambda: utility.wait_or_raise_bounded((job(i) for i in range(count)), limit=1000),
+        "bounded 10000": lambda: utility.wait_or_raise_bounded((job(i) for i in range(count)), limit=10000),
+    }
+
+    print(f"{count:,} awaitables")
+    print(f"{'function':<16} {'awaitables/s':>14} {'peak memory':>14}")
+
+    for name, factory in cases.items():
+        elapsed, peak = run(factory)
+        print(f"{name:<16} {count / elapsed:>14,.0f} {peak / 2**20:>12.1f}MiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
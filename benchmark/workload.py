@@ -0,0 +1,46 @@
+"""
+Synthetic key traces shared by the benchmarks.
+"""
+
+from __future__ import annotations
+
+import bisect
+import itertools
+import random
+
+
+def uniform(length, keys, *, seed=0):
+    rng = random.Random(seed)
+
+    return [rng.randrange(keys) for _ in range(length)]
+
+
+def zipf(length, keys, *, alpha=1.0, seed=0):
+    rng = random.Random(seed)
+
+    weights = list(itertools.accumulate(1 / (i + 1) ** alpha for i in range(keys)))
+    total = weights[-1]
+
+    return [bisect.bisect(weights, rng.random() * total) for _ in range(length)]
+
+
+def zipf_with_scans(length, keys, *, alpha=1.0, every=50_000, scan=20_000, seed=0):
+    trace = list()
+
+    start = keys
+    for i, key in enumerate(zipf(length, keys, alpha=alpha, seed=seed)):
+        if i % every == every - 1:
+            trace.extend(range(start, start + scan))
+            start += scan
+
+        trace.append(key)
+
+    return trace
+
+
+def workloads(length, keys):
+    return {
+        "zipf": zipf(length, keys),
+        "uniform": uniform(length, keys),
+        "scan": zipf_with_scans(length, keys, every=max(1, length // 10), scan=max(1, length // 25)),
+    }
@@ -0,0 +1,186 @@
+import asyncio
+import time
+import unittest
+import warnings
+
+import utility
+
+
+class TestLimiterFairness(unittest.IsolatedAsyncioTestCase):
+    async def admit_all(self, limiter, count):
+        admitted = list()
+
+        async def waiter(i):
+            async with limiter:
+                admitted.append(i)
+
+        await asyncio.gather(*(waiter(i) for i in range(count)))
+
+        return admitted
+
+    async def test_token_bucket_admits_in_order(self):
+        limiter = utility.TokenBucketLimiter(rate=1000, capacity=5)
+
+        self.assertEqual(await self.admit_all(limiter, 50), list(range(50)))
+
+    async def test_sliding_window_admits_in_order(self):
+        limiter = utility.SlidingWindowLimiter(max_calls=5, period=0.01)
+
+        self.assertEqual(await self.admit_all(limiter, 50), list(range(50)))
+
+    async def test_new_caller_does_not_barge(self):
+        limiter = utility.TokenBucketLimiter(rate=20)
+        admitted = list()
+
+        async def waiter(name):
+            await limiter.acquire()
+            admitted.append(name)
+
+        await limiter.acquire()
+
+        first = asyncio.ensure_future(waiter("first"))
+        await asyncio.sleep(0)
+
+        # NOTE: blocks the loop past the next token, so that the new caller
+        #       runs before the timer which admits the first waiter
+        time.sleep(0.1)
+        second = asyncio.ensure_future(waiter("second"))
+
+        await asyncio.gather(first, second)
+
+        self.assertEqual(admitted, ["first", "second"])
+
+    async def test_cancelled_waiter_is_skipped(self):
+        loop = asyncio.get_running_loop()
+        limiter = utility.SlidingWindowLimiter(max_calls=1, period=0.1)
+        waiting_after_one_period = list()
+
+        await limiter.acquire()
+
+        cancelled = asyncio.ensure_future(limiter.acquire())
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+
+        # NOTE: timers run in order however late the loop is, so this runs
+        #       after the first permit is granted and before the second
+        loop.call_later(0.15, lambda: waiting_after_one_period.append(limiter.waiting))
+
+        cancelled.cancel()
+        await waiting
+        await asyncio.sleep(0.1)
+
+        self.assertTrue(cancelled.cancelled())
+        self.assertEqual(waiting_after_one_period, [0])
+
+    async def test_granted_permit_is_handed_off_on_cancel(self):
+        loop = asyncio.get_running_loop()
+        limiter = utility.SlidingWindowLimiter(max_calls=1, period=0.1)
+
+        await limiter.acquire()
+
+        cancelled = asyncio.ensure_future(limiter.acquire())
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+
+        # NOTE: both timers expire while the loop is blocked, and run in
+        #       order, so the first waiter is cancelled just after it was
+        #       granted its permit and before it resumes
+        loop.call_at(loop.time() + 0.15, cancelled.cancel)
+        time.sleep(0.2)
+
+        # NOTE: the cancelled waiter resumes, and hands off its permit,
+        #       before any timer scheduled from now on can run, and the
+        #       second permit would only follow a whole period later
+        waiting_after_hand_off = list()
+        loop.call_later(0.05, lambda: waiting_after_hand_off.append(limiter.waiting))
+
+        await waiting
+
+        with self.assertRaises(asyncio.CancelledError):
+            await cancelled
+
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(waiting_after_hand_off, [0])
+
+
+class TestLimiterLoops(unittest.TestCase):
+    def test_waiter_cancelled_with_its_loop_is_dropped(self):
+        limiter = utility.TokenBucketLimiter(rate=100)
+
+        async def abandon():
+            await limiter.acquire()
+
+            # NOTE: left waiting, and cancelled when asyncio.run ends
+            asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0)
+
+        asyncio.run(abandon())
+
+        async def acquire():
+            await asyncio.wait_for(limiter.acquire(), 5)
+            await asyncio.wait_for(limiter.acquire(), 5)
+
+        asyncio.run(acquire())
+
+
+class TestDrain(unittest.IsolatedAsyncioTestCase):
+    async def test_timeout_returns_cancelled_tasks_without_warning(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+
+            tasks = await utility.wait_or_raise([asyncio.sleep(0), asyncio.sleep(60), asyncio.sleep(60)], timeout=0.01, drain=1)
+
+        self.assertEqual(len(tasks), 3)
+        self.assertEqual(sum(task.cancelled() for task in tasks), 2)
+
+    @unittest.skipUnless(utility.SUPPORTS_EXCEPTIONGROUP, "requires ExceptionGroup")
+    async def test_group_carries_counts(self):
+        async def fail():
+            raise ValueError
+
+        with self.assertRaises(ExceptionGroup) as context:  # noqa: F821  # builtin since 3.11
+            await utility.wait_or_raise([fail(), asyncio.sleep(60)], drain=1)
+
+        self.assertEqual((context.exception.cancelled, context.exception.pending), (1, 0))
+
+
+class TestBoundedWait(unittest.IsolatedAsyncioTestCase):
+    async def slow_source(self, first):
+        yield first
+        await asyncio.sleep(60)
+
+    async def test_timeout_while_source_is_slow(self):
+        async def job():
+            return 1
+
+        tasks = await asyncio.wait_for(utility.wait_or_raise_bounded(self.slow_source(job()), limit=10, timeout=0.05), 10)
+
+        self.assertEqual([task.result() for task in tasks], [1])
+
+    async def test_exception_while_source_is_slow(self):
+        async def job():
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            await asyncio.wait_for(utility.wait_or_raise_bounded(self.slow_source(job()), limit=10), 10)
+
+
+class TestBatchCalls(unittest.TestCase):
+    def test_timer_is_rescheduled_in_a_new_loop(self):
+        @utility.batch_calls(max_size=100, max_wait=0.01)
+        async def double(items):
+            await asyncio.sleep(0.05)
+            return [item * 2 for item in items]
+
+        async def abandon():
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(double(1), 0.001)
+
+        asyncio.run(abandon())
+
+        self.assertEqual(asyncio.run(asyncio.wait_for(double(2), 5)), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
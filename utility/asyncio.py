@@ -3,14 +3,77 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from asyncio import Task
-    from collections.abc import Awaitable, Iterable
-    from typing import TypeVar
+    from collections.abc import AsyncGenerator, AsyncIterable, AsyncIterator, Awaitable, Callable, Coroutine, Iterable, Sequence
+    from typing import Any, TypeVar, overload
+    from typing_extensions import ParamSpec, Self
 
+    _P = ParamSpec("_P")
     _T = TypeVar("_T")
+    _U = TypeVar("_U")
 
 import asyncio
+import collections
+import functools
+import itertools
+import operator
+import warnings
 
+from .call import call_maybe_coroutine
 from .typing import MISSING
+from .version import SUPPORTS_EXCEPTIONGROUP
+
+
+async def _drain(
+    tasks: Iterable[asyncio.Future[Any]],
+    drain: float,
+    /,
+) -> tuple[int, int]:
+    # NOTE: cancels every task which is not done and waits up to drain
+    #       seconds for them to finish cancelling, so that their cleanup
+    #       runs now rather than during unrelated work. returns how many
+    #       were cancelled and how many of them were still pending
+    #       afterwards, and only warns about the latter, which ignored
+    #       their cancellation
+    pending = [task for task in tasks if not task.done()]
+
+    for task in pending:
+        task.cancel()
+
+    if pending and drain > 0:
+        _, remaining = await asyncio.wait(pending, timeout=drain)
+    else:
+        remaining = pending
+
+    if remaining:
+        warnings.warn(f"{len(remaining)} of {len(pending)} cancelled tasks were still pending after {drain} seconds", RuntimeWarning, stacklevel=3)
+
+    return len(pending), len(remaining)
+
+
+def _raise_failures(
+    tasks: Iterable[asyncio.Future[Any]],
+    drained: tuple[int, int],
+    /,
+) -> None:
+    # NOTE: raises every exception of tasks together in an
+    #       ExceptionGroup where supported, or the first one otherwise.
+    #       the group carries the counts returned by _drain as its
+    #       cancelled and pending attributes
+    exceptions = [task.exception() for task in tasks if task.done() and not task.cancelled() and task.exception() is not None]
+
+    if not exceptions:
+        return
+
+    if SUPPORTS_EXCEPTIONGROUP:
+        cancelled, pending = drained
+
+        group = ExceptionGroup(f"{len(exceptions)} awaitables raised, {cancelled} were cancelled while pending", exceptions)  # type: ignore  # noqa: F821  # builtin since 3.11
+        group.cancelled = cancelled
+        group.pending = pending
+
+        raise group
+
+    raise exceptions[0]  # type: ignore  # checked above
 
 
 async def wait_or_raise(
@@ -18,9 +81,58 @@ async def wait_or_raise(
     /,
     *,
     timeout: float = MISSING,
+    drain: float = MISSING,
 ) -> Iterable[Task[_T]]:
+    """
+    Runs the awaitables in ``aws`` concurrently and waits for them to
+    complete.
+
+    The first exception cancels every running awaitable and is raised.
+    A timeout does the same without raising.
+
+
+    Parameters
+    ----------
+    aws: Iterable[Awaitable[Any]]
+        The awaitables.
+    timeout: :class:`float`
+        The number of seconds to wait for in total.
+    drain: :class:`float`
+        The number of seconds to wait for cancelled awaitables to finish
+        cancelling, including when this is cancelled itself. A
+        :class:`RuntimeWarning` is issued for any still pending after
+        it. Exceptions of every awaitable, including those raised while
+        cancelling, are raised together in an :class:`ExceptionGroup`
+        where supported, whose ``cancelled`` and ``pending`` attributes
+        are the number of awaitables which were cancelled and how many
+        of them were still pending after it. Without an exception, every
+        task is returned, including those which were cancelled.
+        Defaults to not waiting, and raising only the first exception.
+
+
+    Returns
+    -------
+    Iterable[:class:`asyncio.Task`]
+        The completed tasks, or every task with ``drain``.
+    """
+
+    tasks = (*(asyncio.Task(aw) for aw in aws),)
+
+    if drain is not MISSING:
+        try:
+            _, pending = await asyncio.wait(tasks, timeout=timeout if timeout is not MISSING else None, return_when=asyncio.FIRST_EXCEPTION)
+        except asyncio.CancelledError:
+            await _drain(tasks, drain)
+            raise
+
+        _raise_failures(tasks, await _drain(pending, drain))
+
+        # NOTE: cancelled tasks are returned too, so that they can be
+        #       told apart with Task.cancelled and counted
+        return tasks
+
     done, pending = await asyncio.wait(
-        (*(asyncio.Task(aw) for aw in aws),),
+        tasks,
         timeout=timeout if timeout is not MISSING else None,
         return_when=asyncio.FIRST_EXCEPTION,
     )
@@ -40,6 +152,698 @@ async def wait_or_raise(
     return done
 
 
+async def _complete(
+    aws: Iterable[Awaitable[_T]] | AsyncIterable[Awaitable[_T]],
+    limit: int | Limiter | None,
+    timeout: float | None,
+    drain: float | None,
+    /,
+) -> AsyncGenerator[tuple[int, Task[_T]], None]:
+    # NOTE: yields each task with its index in aws as it completes,
+    #       taking awaitables from aws only as they are needed to keep at
+    #       most limit running. the first exception cancels every running
+    #       task and is raised, as does closing the generator early. with
+    #       drain, cancelled tasks are drained and their exceptions raised
+    #       along with the first as in wait_or_raise. with a limiter as
+    #       limit, each awaitable is held until the limiter admits it,
+    #       while running tasks continue to be waited on
+    limiter = None
+
+    if isinstance(limit, Limiter):
+        limiter, limit = limit, None
+    elif limit is not None and limit < 1:
+        raise ValueError("limit must be a positive integer")
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout if timeout is not None else None
+
+    if hasattr(aws, "__aiter__"):
+        aiterator = aws.__aiter__()  # type: ignore  # aws is an AsyncIterable here
+        iterator = None
+    else:
+        aiterator = None
+        iterator = iter(aws)  # type: ignore  # aws is an Iterable here
+
+    indices: dict[asyncio.Future[_T], int] = dict()
+    counter = itertools.count()
+    pending: set[asyncio.Future[_T]] = set()
+    exhausted = False
+
+    held: Awaitable[_T] | None = None
+    fetch: asyncio.Future[Awaitable[_T]] | None = None
+    permit: asyncio.Future[None] | None = None
+
+    try:
+        while True:
+            while not exhausted and (limit is None or len(pending) < limit):
+                if held is None and iterator is not None:
+                    try:
+                        held = next(iterator)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                elif held is None:
+                    # NOTE: the next awaitable of an async iterable is
+                    #       waited on along with the running tasks, so that
+                    #       a slow source delays neither the timeout nor
+                    #       the first exception
+                    if fetch is None:
+                        fetch = asyncio.ensure_future(aiterator.__anext__())  # type: ignore  # aiterator is set when iterator is not
+
+                    if not fetch.done():
+                        break
+
+                    try:
+                        held = fetch.result()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    finally:
+                        fetch = None
+
+                if limiter is not None:
+                    if permit is None:
+                        permit = asyncio.ensure_future(limiter.acquire())
+
+                    if not permit.done():
+                        break
+
+                    permit = None
+
+                task = asyncio.ensure_future(held)
+                indices[task] = next(counter)
+                pending.add(task)
+                held = None
+
+            if not pending and permit is None and fetch is None:
+                return
+
+            remaining = deadline - loop.time() if deadline is not None else None
+
+            if remaining is not None and remaining <= 0:
+                return
+
+            waiting: set[asyncio.Future[Any]] = {*pending}
+
+            if permit is not None:
+                waiting.add(permit)
+
+            if fetch is not None:
+                waiting.add(fetch)
+
+            done, _ = await asyncio.wait(waiting, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                return
+
+            # NOTE: leaves out the permit and fetch, if they are done
+            finished = pending & done
+            pending -= finished
+
+            for task in finished:
+                if not task.cancelled() and task.exception() is not None:
+                    if drain is not None:
+                        _raise_failures([*finished, *pending], await _drain(pending, drain))
+
+                    raise task.exception()  # type: ignore  # checked above
+
+            for task in sorted(finished, key=indices.__getitem__):
+                yield indices.pop(task), task  # type: ignore  # ensure_future returns a Task for coroutines
+    finally:
+        if permit is not None:
+            permit.cancel()
+
+        if fetch is not None:
+            fetch.cancel()
+
+        if asyncio.iscoroutine(held):
+            held.close()
+
+        if drain is not None:
+            await _drain(pending, drain)
+        else:
+            for task in pending:
+                task.cancel()
+
+
+async def wait_or_raise_bounded(
+    aws: Iterable[Awaitable[_T]] | AsyncIterable[Awaitable[_T]],
+    /,
+    *,
+    limit: int | Limiter,
+    timeout: float = MISSING,
+    drain: float = MISSING,
+) -> list[Task[_T]]:
+    """
+    Like :func:`wait_or_raise`, but takes awaitables from ``aws`` only
+    as they are needed to keep at most ``limit`` of them running.
+
+    The first exception cancels every running awaitable, stops taking
+    new ones, and is raised. A timeout does the same without raising.
+
+
+    Parameters
+    ----------
+    aws: Iterable[Awaitable[Any]] | AsyncIterable[Awaitable[Any]]
+        The awaitables, which may be produced lazily.
+    limit: :class:`int` | :class:`Limiter`
+        The maximum number of awaitables running at once, or a limiter
+        which admits each awaitable before it starts.
+    timeout: :class:`float`
+        The number of seconds to wait for in total.
+    drain: :class:`float`
+        The number of seconds to wait for cancelled awaitables to finish
+        cancelling, as with :func:`wait_or_raise`.
+
+
+    Returns
+    -------
+    list[:class:`asyncio.Task`]
+        The completed tasks, in the order of ``aws``.
+    """
+
+    completed = [item async for item in _complete(aws, limit, timeout if timeout is not MISSING else None, drain if drain is not MISSING else None)]
+    completed.sort(key=operator.itemgetter(0))
+
+    return [task for _, task in completed]
+
+
+async def as_completed_or_raise(
+    aws: Iterable[Awaitable[_T]] | AsyncIterable[Awaitable[_T]],
+    /,
+    *,
+    limit: int | Limiter = MISSING,
+    timeout: float = MISSING,
+    drain: float = MISSING,
+) -> AsyncIterator[_T]:
+    """
+    Yields the result of each awaitable in ``aws`` as soon as it
+    completes.
+
+    The first exception cancels every running awaitable and is raised.
+    A timeout does the same without raising. Running awaitables are
+    also cancelled when the iterator is closed early, e.g. with
+    :func:`contextlib.aclosing`.
+
+
+    Parameters
+    ----------
+    aws: Iterable[Awaitable[Any]] | AsyncIterable[Awaitable[Any]]
+        The awaitables, which may be produced lazily.
+    limit: :class:`int` | :class:`Limiter`
+        The maximum number of awaitables running at once, or a limiter
+        which admits each awaitable before it starts. Defaults to no
+        limit.
+    timeout: :class:`float`
+        The number of seconds to wait for in total.
+    drain: :class:`float`
+        The number of seconds to wait for cancelled awaitables to finish
+        cancelling, as with :func:`wait_or_raise`.
+    """
+
+    # NOTE: a TaskGroup is not used even where it is available, since
+    #       it would cancel the task iterating over this generator on the
+    #       first exception, including while it is running its own code
+    #       between two results
+    completed = _complete(aws, limit if limit is not MISSING else None, timeout if timeout is not MISSING else None, drain if drain is not MISSING else None)
+
+    try:
+        async for _, task in completed:
+            yield task.result()
+    finally:
+        await completed.aclose()
+
+
+if TYPE_CHECKING:
+
+    @overload
+    def batch_calls(
+        wrapped: Callable[[list[_T]], Sequence[_U] | Awaitable[Sequence[_U]]],
+        /,
+    ) -> Callable[[_T], Coroutine[Any, Any, _U]]: ...
+
+    @overload
+    def batch_calls(
+        *,
+        max_size: int = ...,
+        max_wait: float = ...,
+    ) -> Callable[[Callable[[list[_T]], Sequence[_U] | Awaitable[Sequence[_U]]]], Callable[[_T], Coroutine[Any, Any, _U]]]: ...
+
+
+def batch_calls(
+    wrapped: Callable[[list[_T]], Sequence[_U] | Awaitable[Sequence[_U]]] = MISSING,
+    /,
+    *,
+    max_size: int = MISSING,
+    max_wait: float = MISSING,
+) -> Callable[[_T], Coroutine[Any, Any, _U]] | Callable[[Callable[[list[_T]], Sequence[_U] | Awaitable[Sequence[_U]]]], Callable[[_T], Coroutine[Any, Any, _U]]]:
+    """
+    |decorator_dynamic|
+
+    Turns a function which takes a list of items and returns a
+    sequence of their results into a coroutine function which takes a
+    single item, coalescing concurrent calls into a single call of the
+    wrapped function.
+
+    A batch is dispatched once it holds ``max_size`` items, or
+    ``max_wait`` seconds after its first item. Each caller receives its
+    own result, or raises its own exception if the result is an
+    exception instance. If the wrapped function raises, every caller in
+    the batch raises. The number of batches and items, the largest
+    batch, and the total and longest time items waited to be dispatched
+    are counted in ``__utility_batch_statistics__``.
+
+
+    Parameters
+    ----------
+    max_size: :class:`int`
+        The maximum number of items in a batch. Defaults to ``64``.
+    max_wait: :class:`float`
+        The maximum number of seconds an item waits to be dispatched.
+        Defaults to ``0.005``.
+    """
+
+    max_size = max_size if max_size is not MISSING else 64
+    max_wait = max_wait if max_wait is not MISSING else 0.005
+
+    if max_size < 1:
+        raise ValueError("max_size must be a positive integer")
+
+    if max_wait < 0:
+        raise ValueError("max_wait must be 0 or a positive number")
+
+    def decorator(
+        wrapped: Callable[[list[_T]], Sequence[_U] | Awaitable[Sequence[_U]]],
+        /,
+    ) -> Callable[[_T], Coroutine[Any, Any, _U]]:
+        calls: list[tuple[_T, asyncio.Future[_U], float]] = list()
+        handle: asyncio.TimerHandle | None = None
+        tasks: set[asyncio.Task[None]] = set()
+        bound: asyncio.AbstractEventLoop | None = None
+
+        statistics = {"batches": 0, "items": 0, "max_size": 0, "wait": 0.0, "max_wait": 0.0}
+
+        def flush(
+            loop: asyncio.AbstractEventLoop,
+            /,
+        ) -> None:
+            nonlocal calls, handle
+
+            if handle is not None:
+                handle.cancel()
+                handle = None
+
+            # NOTE: callers which were cancelled while waiting are left out
+            batch = [call for call in calls if not call[1].done()]
+            calls = list()
+
+            if not batch:
+                return
+
+            now = loop.time()
+            waits = [now - enqueued for _, _, enqueued in batch]
+
+            statistics["batches"] += 1
+            statistics["items"] += len(batch)
+            statistics["max_size"] = max(statistics["max_size"], len(batch))
+            statistics["wait"] += sum(waits)
+            statistics["max_wait"] = max(statistics["max_wait"], *waits)
+
+            # NOTE: the event loop only holds weak references to tasks
+            task = loop.create_task(dispatch(batch))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        async def dispatch(
+            batch: list[tuple[_T, asyncio.Future[_U], float]],
+            /,
+        ) -> None:
+            try:
+                results = await call_maybe_coroutine(wrapped, [item for item, _, _ in batch])
+
+                if len(results) != len(batch):
+                    raise ValueError(f"{wrapped.__qualname__} returned {len(results)} results for {len(batch)} items")
+            except asyncio.CancelledError:
+                for _, future, _ in batch:
+                    future.cancel()
+
+                raise
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+                return
+
+            for (_, future, _), result in zip(batch, results):
+                if future.done():
+                    continue
+
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+        async def inner(
+            item: _T,
+            /,
+        ) -> _U:
+            nonlocal calls, handle, bound
+
+            loop = asyncio.get_running_loop()
+
+            if loop is not bound:
+                # NOTE: calls and the timer left over from another loop,
+                #       e.g. by callers which timed out before it ended,
+                #       can never be flushed and are dropped
+                calls = list()
+                handle = None
+                bound = loop
+
+            future = loop.create_future()
+            calls.append((item, future, loop.time()))
+
+            if len(calls) >= max_size:
+                flush(loop)
+            elif handle is None:
+                handle = loop.call_later(max_wait, flush, loop)
+
+            return await future
+
+        inner.__utility_batch_statistics__ = statistics
+
+        return inner
+
+    if wrapped is MISSING:
+        return decorator
+
+    return decorator(wrapped)
+
+
+class Limiter:
+    """
+    TODO
+    """
+
+    __slots__ = ("_waiters", "_handle", "_loop")
+
+    def __init__(
+        self: Self,
+        /,
+    ) -> None:
+        # NOTE: waiters are woken in order by a single timer, scheduled
+        #       for when the first of them can next be admitted, rather
+        #       than each of them polling
+        self._waiters: collections.deque[asyncio.Future[None]] = collections.deque()
+        self._handle: asyncio.TimerHandle | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def __call__(
+        self: Self,
+        wrapped: Callable[_P, _T | Awaitable[_T]],
+        /,
+    ) -> Callable[_P, Coroutine[Any, Any, _T]]:
+        @functools.wraps(wrapped)
+        async def inner(
+            *args: _P.args,
+            **kwargs: _P.kwargs,
+        ) -> _T:
+            await self.acquire()
+
+            return await call_maybe_coroutine(wrapped, *args, **kwargs)
+
+        return inner
+
+    async def __aenter__(
+        self: Self,
+        /,
+    ) -> None:
+        await self.acquire()
+
+    async def __aexit__(
+        self: Self,
+        *args: Any,
+    ) -> None:
+        pass
+
+    @property
+    def waiting(
+        self: Self,
+        /,
+    ) -> int:
+        return sum(not waiter.done() for waiter in self._waiters)
+
+    def _take(
+        self: Self,
+        now: float,
+        /,
+    ) -> float:
+        # NOTE: takes a permit and returns 0, or returns the number of
+        #       seconds until one is available
+        raise NotImplementedError
+
+    def _refund(
+        self: Self,
+        /,
+    ) -> None:
+        raise NotImplementedError
+
+    def _wake(
+        self: Self,
+        loop: asyncio.AbstractEventLoop,
+        /,
+    ) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        now = loop.time()
+        waiters = self._waiters
+
+        while waiters:
+            if waiters[0].done():
+                waiters.popleft()
+                continue
+
+            delay = self._take(now)
+
+            if delay > 0:
+                self._handle = loop.call_at(now + delay, self._wake, loop)
+                return
+
+            waiters.popleft().set_result(None)
+
+    async def acquire(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Waits until the limiter admits one more call.
+
+        Callers are admitted in the order they called this, and a
+        caller never takes a permit ahead of one which is waiting.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        if loop is not self._loop:
+            # NOTE: waiters and the timer left over from another loop, e.g.
+            #       by callers which were cancelled as it ended, can never
+            #       be woken by it and are dropped
+            if self._handle is not None:
+                self._handle.cancel()
+                self._handle = None
+
+            self._waiters.clear()
+            self._loop = loop
+
+        if not self._waiters:
+            now = loop.time()
+            delay = self._take(now)
+
+            if delay <= 0:
+                return
+
+            self._handle = loop.call_at(now + delay, self._wake, loop)
+
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # NOTE: the permit was granted as the caller was cancelled,
+                #       so it is handed to the next waiter instead
+                self._refund()
+                self._wake(loop)
+
+            raise
+
+
+class TokenBucketLimiter(Limiter):
+    """
+    TODO
+    """
+
+    __slots__ = ("_rate", "_capacity", "_tokens", "_updated")
+
+    def __init__(
+        self: Self,
+        /,
+        *,
+        rate: float,
+        capacity: int = MISSING,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        rate: :class:`float`
+            The number of calls admitted per second.
+        capacity: :class:`int`
+            The number of calls which may be admitted at once after the
+            limiter was idle. Defaults to ``1``.
+        """
+
+        capacity = capacity if capacity is not MISSING else 1
+
+        if rate <= 0:
+            raise ValueError("rate must be a positive number")
+
+        if capacity < 1:
+            raise ValueError("capacity must be a positive integer")
+
+        super().__init__()
+
+        self._rate: float = rate
+        self._capacity: int = capacity
+        self._tokens: float = capacity
+        self._updated: float | None = None
+
+    @property
+    def rate(
+        self: Self,
+        /,
+    ) -> float:
+        return self._rate
+
+    @property
+    def capacity(
+        self: Self,
+        /,
+    ) -> int:
+        return self._capacity
+
+    def _take(
+        self: Self,
+        now: float,
+        /,
+    ) -> float:
+        if self._updated is not None:
+            self._tokens += (now - self._updated) * self._rate
+
+            # NOTE: tokens are only capped while nothing is waiting, since
+            #       otherwise those accrued while the timer fired late
+            #       would be lost and the rate would fall short
+            if not self._waiters:
+                self._tokens = min(self._capacity, self._tokens)
+
+        self._updated = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+
+        return (1 - self._tokens) / self._rate
+
+    def _refund(
+        self: Self,
+        /,
+    ) -> None:
+        self._tokens = min(self._capacity, self._tokens + 1)
+
+
+class SlidingWindowLimiter(Limiter):
+    """
+    TODO
+    """
+
+    __slots__ = ("_max_calls", "_period", "_admitted")
+
+    def __init__(
+        self: Self,
+        /,
+        *,
+        max_calls: int,
+        period: float,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        max_calls: :class:`int`
+            The maximum number of calls admitted within any ``period``.
+        period: :class:`float`
+            The length of the window, in seconds.
+        """
+
+        if max_calls < 1:
+            raise ValueError("max_calls must be a positive integer")
+
+        if period <= 0:
+            raise ValueError("period must be a positive number")
+
+        super().__init__()
+
+        self._max_calls: int = max_calls
+        self._period: float = period
+        self._admitted: collections.deque[float] = collections.deque()
+
+    @property
+    def max_calls(
+        self: Self,
+        /,
+    ) -> int:
+        return self._max_calls
+
+    @property
+    def period(
+        self: Self,
+        /,
+    ) -> float:
+        return self._period
+
+    def _take(
+        self: Self,
+        now: float,
+        /,
+    ) -> float:
+        admitted = self._admitted
+
+        while admitted and admitted[0] <= now - self._period:
+            admitted.popleft()
+
+        if len(admitted) < self._max_calls:
+            admitted.append(now)
+            return 0
+
+        return admitted[0] + self._period - now
+
+    def _refund(
+        self: Self,
+        /,
+    ) -> None:
+        # NOTE: the refunded permit is the latest or was granted at the
+        #       same time as it, so forgetting the latest is equivalent
+        if self._admitted:
+            self._admitted.pop()
+
+
 __all__ = [
+    "as_completed_or_raise",
+    "batch_calls",
     "wait_or_raise",
+    "wait_or_raise_bounded",
+    "Limiter",
+    "TokenBucketLimiter",
+    "SlidingWindowLimiter",
 ]
@@ -3,27 +3,773 @@ from typing import Generic, TYPE_CHECKING, TypeVar
 
 if TYPE_CHECKING:
     from collections import OrderedDict
-    from collections.abc import Callable, Generator
-    from typing import Any, overload
+    from collections.abc import AsyncGenerator, Awaitable, Callable, Coroutine, Generator, Hashable, Iterable, Iterator, Mapping
+    from typing import Any, BinaryIO, Literal, overload
     from typing_extensions import TypeAlias, ParamSpec, Self
 
     _P = ParamSpec("_P")
     _T = TypeVar("_T")
     _U = TypeVar("_U")
 
+    _AsyncGenerator: TypeAlias = AsyncGenerator[_T, None]
+    _AsyncGeneratorFunc: TypeAlias = Callable[_P, AsyncGenerator[_T, None]]
     _Generator: TypeAlias = Generator[_T, None, Any]
     _GeneratorFunc: TypeAlias = Callable[_P, Generator[_T, None, Any]]
+    _CoroutineFunc: TypeAlias = Callable[_P, Coroutine[Any, Any, _T]]
+    _Policy: TypeAlias = Literal["lfu", "lru", "tinylfu"]
 
+import array
+import asyncio
 import collections
+import collections.abc
+import concurrent.futures
+import functools
+import hashlib
+import heapq
+import inspect
+import itertools
+import json
+import multiprocessing
+import multiprocessing.shared_memory
+import operator
+import os
+import pickle
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import types
+import weakref
 
+from .call import bind_function
 from .typing import MISSING
 
 
+_kwargs_mark = object()
+_fast_types = {int, str}
+
+
 def _make_key(
     args: tuple[Any, ...],
     kwargs: dict[str, Any],
+    typed: bool = False,
+    /,
+) -> Hashable:
+    # NOTE: the key is the flattened arguments themselves, rather than
+    #       their hash, so that colliding hashes never share an entry.
+    #       a functools._HashedSeq-style wrapper which caches the hash
+    #       was measured slower here since its __hash__ runs in Python,
+    #       whereas tuple hashing and comparison stay in C
+    if kwargs:
+        # NOTE: keyword order is significant here, as it is in
+        #       functools.lru_cache, to avoid sorting on every call
+        key = (*args, _kwargs_mark, *kwargs.items())
+    else:
+        key = args
+
+    if typed:
+        key = (*key, *map(type, args), *map(type, kwargs.values()))
+    elif len(key) == 1 and type(key[0]) in _fast_types:
+        return key[0]
+
+    return key
+
+
+def _make_binder(
+    wrapped: Callable[..., Any],
+    /,
+) -> Callable[..., tuple[Any, ...]]:
+    # NOTE: compiles a function with the same parameters as wrapped
+    #       which returns every argument in order with defaults applied,
+    #       so that binding is done by the interpreter's own argument
+    #       parsing rather than by inspect.Signature.bind on every call.
+    #       unhashable defaults, such as a mutable b=[], are keyed by
+    #       identity, by a marker which stands in for them whenever they
+    #       are passed or applied
+    signature = inspect.signature(wrapped)
+
+    namespace: dict[str, Any] = {"__utility_sorted": sorted, "__utility_tuple": tuple}
+    parameters: list[str] = list()
+    values: list[str] = list()
+
+    kind = inspect.Parameter.POSITIONAL_ONLY
+    for i, parameter in enumerate(signature.parameters.values()):
+        if kind is inspect.Parameter.POSITIONAL_ONLY and parameter.kind is not kind:
+            if parameters:
+                parameters.append("/")
+
+        if parameter.kind is inspect.Parameter.KEYWORD_ONLY and kind.value < inspect.Parameter.VAR_POSITIONAL.value:
+            parameters.append("*")
+
+        kind = parameter.kind
+
+        if kind is inspect.Parameter.VAR_POSITIONAL:
+            parameters.append(f"*{parameter.name}")
+            values.append(parameter.name)
+        elif kind is inspect.Parameter.VAR_KEYWORD:
+            parameters.append(f"**{parameter.name}")
+            values.append(f"__utility_tuple(__utility_sorted({parameter.name}.items()))")
+        elif parameter.default is not inspect.Parameter.empty:
+            namespace[f"__utility_default_{i}"] = parameter.default
+            parameters.append(f"{parameter.name}=__utility_default_{i}")
+
+            try:
+                hash(parameter.default)
+            except TypeError:
+                namespace[f"__utility_marker_{i}"] = object()
+                values.append(f"__utility_marker_{i} if {parameter.name} is __utility_default_{i} else {parameter.name}")
+            else:
+                values.append(parameter.name)
+        else:
+            parameters.append(parameter.name)
+            values.append(parameter.name)
+
+    if kind is inspect.Parameter.POSITIONAL_ONLY and parameters:
+        parameters.append("/")
+
+    source = f"def __utility_bind({', '.join(parameters)}):\n    return ({''.join(f'({value}), ' for value in values)})"
+    exec(source, namespace)
+
+    # NOTE: argument errors name the code object before 3.10 and the
+    #       function's __qualname__ since
+    bind = namespace["__utility_bind"]
+    bind.__code__ = bind.__code__.replace(co_name=wrapped.__name__)
+    bind.__name__ = wrapped.__name__
+    bind.__qualname__ = wrapped.__qualname__
+
+    return bind
+
+
+def _make_key_function(
+    wrapped: Callable[..., Any],
+    key: Callable[..., Hashable] | None,
+    normalize: bool,
+    typed: bool,
+    /,
+) -> Callable[[tuple[Any, ...], dict[str, Any]], Hashable]:
+    if key is not None:
+
+        def make_key(
+            args: tuple[Any, ...],
+            kwargs: dict[str, Any],
+            /,
+        ) -> Hashable:
+            return key(*args, **kwargs)
+
+    elif normalize:
+        bind = _make_binder(wrapped)
+
+        def make_key(
+            args: tuple[Any, ...],
+            kwargs: dict[str, Any],
+            /,
+        ) -> Hashable:
+            key = bind(*args, **kwargs)
+
+            if typed:
+                return (*key, *map(type, key))
+            elif len(key) == 1 and type(key[0]) in _fast_types:
+                return key[0]
+
+            return key
+
+    elif typed:
+
+        def make_key(
+            args: tuple[Any, ...],
+            kwargs: dict[str, Any],
+            /,
+        ) -> Hashable:
+            return _make_key(args, kwargs, True)
+
+    else:
+        make_key = _make_key
+
+    return make_key
+
+
+def _check_cache_options(
+    max_size: int | None,
+    policy: _Policy,
+    ttl: float | None,
+    thread_safe: bool,
+    max_weight: int | None,
+    /,
+) -> None:
+    if isinstance(max_size, int):
+        if max_size < -1 or max_size == 0:
+            raise ValueError("max_size must be None, -1, or a positive integer")
+
+    if max_weight is not None:
+        if max_weight <= 0:
+            raise ValueError("max_weight must be None or a positive integer")
+
+        if thread_safe:
+            raise ValueError("thread_safe is not supported with max_weight")
+
+        if policy == "tinylfu":
+            raise ValueError("max_weight is not supported with policy 'tinylfu'")
+
+    if policy not in ("lfu", "lru", "tinylfu"):
+        raise ValueError("policy must be 'lfu', 'lru', or 'tinylfu'")
+
+    if ttl is not None:
+        if policy != "lru":
+            raise ValueError("ttl is only supported with policy 'lru'")
+
+        if ttl <= 0:
+            raise ValueError("ttl must be None or a positive number")
+
+    if thread_safe:
+        if policy != "lru":
+            raise ValueError("thread_safe is only supported with policy 'lru'")
+
+        if ttl is not None:
+            raise ValueError("thread_safe is not supported with ttl")
+
+
+def _check_key_options(
+    key: Callable[..., Hashable] | None,
+    normalize: bool,
+    typed: bool,
+    /,
+) -> None:
+    if key is not None:
+        if normalize:
+            raise ValueError("key and normalize are mutually exclusive")
+
+        if typed:
+            raise ValueError("key and typed are mutually exclusive")
+
+
+def _check_refresh_options(
+    refresh_after: float | None,
+    ttl: float | None,
+    /,
+) -> None:
+    if refresh_after is not None:
+        if refresh_after <= 0:
+            raise ValueError("refresh_after must be None or a positive number")
+
+        if ttl is not None and refresh_after >= ttl:
+            raise ValueError("refresh_after must be less than ttl")
+
+
+def _check_error_options(
+    error_ttl: float | None,
+    error_backoff: float,
+    max_error_ttl: float | None,
+    /,
+) -> None:
+    if error_ttl is not None and error_ttl <= 0:
+        raise ValueError("error_ttl must be None or a positive number")
+
+    if error_backoff < 1:
+        raise ValueError("error_backoff must be at least 1")
+
+    if max_error_ttl is not None:
+        if error_ttl is None:
+            raise ValueError("max_error_ttl requires error_ttl")
+
+        if max_error_ttl < error_ttl:
+            raise ValueError("max_error_ttl must be at least error_ttl")
+
+
+def _make_cache(
+    max_size: int | None,
+    policy: _Policy,
+    ttl: float | None,
+    thread_safe: bool,
+    max_weight: int | None = None,
+    weigher: Callable[[Any], int] = MISSING,
+    /,
+) -> Cache[Any, Any]:
+    if thread_safe:
+        if max_size == -1 or max_size is None:
+            return ConcurrentCache()
+        else:
+            return ConcurrentLRUCache(max_size=max_size)
+
+    if max_size == -1 or max_size is None:
+        if ttl is None and max_weight is None:
+            return Cache()
+
+        max_size = sys.maxsize
+
+    if ttl is not None:
+        return TTLCache(max_size=max_size, ttl=ttl, max_weight=max_weight, weigher=weigher)
+
+    if policy == "lfu":
+        return LFUCache(max_size=max_size, max_weight=max_weight, weigher=weigher)
+    elif policy == "tinylfu":
+        return TinyLFUCache(max_size=max_size)
+    else:
+        return LRUCache(max_size=max_size, max_weight=max_weight, weigher=weigher)
+
+
+def _make_stable_key(
+    name: str,
+    key: Hashable,
+    /,
+) -> bytes | None:
+    # NOTE: hash() of str and bytes is randomized per process, so the
+    #       on-disk key is a digest of the pickled key instead. keys
+    #       which cannot be pickled are simply not persisted
+    try:
+        data = pickle.dumps((name, key), protocol=4)
+    except Exception:
+        return None
+
+    return hashlib.sha256(data).digest()
+
+
+_refresh_executor: concurrent.futures.ThreadPoolExecutor | None = None
+_refresh_executor_lock = threading.Lock()
+_refresh_tasks: set[asyncio.Task[Any]] = set()
+
+
+def _get_refresh_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _refresh_executor
+
+    if _refresh_executor is None:
+        with _refresh_executor_lock:
+            if _refresh_executor is None:
+                _refresh_executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="utility-cache-refresh")
+
+    return _refresh_executor
+
+
+class _Refresher:
+    # NOTE: stale-while-revalidate bookkeeping for the cache decorators.
+    #       background refreshes never write to the cache themselves,
+    #       their results are handed to the next caller of the same key
+    #       through poll, so that an unsynchronized cache is still only
+    #       ever touched by its callers
+
+    __slots__ = ("_owner", "_cache", "_after", "_start", "_deadlines", "_pending", "_results", "_lock")
+
+    def __init__(
+        self: Self,
+        owner: Any,
+        cache: Cache[Hashable, Any],
+        after: float,
+        start: Callable[[Hashable, tuple[Any, ...], dict[str, Any]], None],
+        /,
+    ) -> None:
+        self._owner: Any = owner
+        self._cache: Cache[Hashable, Any] = cache
+        self._after: float = after
+        self._start: Callable[[Hashable, tuple[Any, ...], dict[str, Any]], None] = start
+
+        self._deadlines: dict[Hashable, float] = dict()
+        self._pending: set[Hashable] = set()
+        self._results: dict[Hashable, Any] = dict()
+        self._lock: threading.Lock = threading.Lock()
+
+        owner.__utility_refreshes__ = 0
+        owner.__utility_refresh_failures__ = 0
+
+    def stamp(
+        self: Self,
+        key: Hashable,
+        /,
+    ) -> None:
+        deadlines = self._deadlines
+        deadlines[key] = time.monotonic() + self._after
+        self._results.pop(key, None)
+
+        if len(deadlines) > 2 * len(self._cache) + 64:
+            with self._lock:
+                cache = self._cache
+                self._deadlines = {key: deadline for key, deadline in deadlines.items() if cache.peek(key, MISSING) is not MISSING}
+                self._results = {key: result for key, result in self._results.items() if key in self._deadlines}
+
+    def poll(
+        self: Self,
+        key: Hashable,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        /,
+    ) -> Any:
+        deadline = self._deadlines.get(key)
+
+        if deadline is None or deadline > time.monotonic():
+            return MISSING
+
+        with self._lock:
+            result = self._results.pop(key, MISSING)
+
+            if result is MISSING and key not in self._pending:
+                self._pending.add(key)
+                self._start(key, args, kwargs)
+
+        if result is not MISSING:
+            self.stamp(key)
+
+        return result
+
+    def _complete(
+        self: Self,
+        key: Hashable,
+        result: Any,
+        /,
+    ) -> None:
+        with self._lock:
+            self._pending.discard(key)
+            self._results[key] = result
+            self._owner.__utility_refreshes__ += 1
+
+    def _fail(
+        self: Self,
+        key: Hashable,
+        /,
+    ) -> None:
+        with self._lock:
+            self._pending.discard(key)
+            self._owner.__utility_refresh_failures__ += 1
+
+        # NOTE: back off for another period rather than retrying on
+        #       every call while the upstream is failing
+        self._deadlines[key] = time.monotonic() + self._after
+
+    def run(
+        self: Self,
+        key: Hashable,
+        compute: Callable[[], Any],
+        /,
+    ) -> None:
+        try:
+            result = compute()
+        except Exception:
+            # NOTE: the stale result keeps being served until ttl, the
+            #       failure is only counted
+            self._fail(key)
+        except BaseException:
+            self._fail(key)
+            raise
+        else:
+            self._complete(key, result)
+
+    async def run_async(
+        self: Self,
+        key: Hashable,
+        compute: Awaitable[Any],
+        /,
+    ) -> None:
+        try:
+            result = await compute
+        except Exception:
+            self._fail(key)
+        except BaseException:
+            self._fail(key)
+            raise
+        else:
+            self._complete(key, result)
+
+
+class _Errors:
+    # NOTE: negative caching for the cache decorators. failures are kept
+    #       in their own LRU cache as [count, deadline, failure], so that
+    #       they never take the place of results, and the period of each
+    #       consecutive failure of a key grows by backoff
+
+    __slots__ = ("_cache", "_ttl", "_backoff", "_max_ttl")
+
+    def __init__(
+        self: Self,
+        max_size: int | None,
+        thread_safe: bool,
+        ttl: float,
+        backoff: float,
+        max_ttl: float | None,
+        /,
+    ) -> None:
+        self._cache: Cache[Hashable, list[Any]] = _make_cache(max_size, "lru", None, thread_safe)
+        self._ttl: float = ttl
+        self._backoff: float = backoff
+        self._max_ttl: float | None = max_ttl
+
+        _unregister_cache(self._cache)
+
+    def get(
+        self: Self,
+        key: Hashable,
+        /,
+    ) -> Any:
+        record = self._cache.peek(key)
+
+        if record is None or record[1] <= time.monotonic():
+            return MISSING
+
+        return record[2]
+
+    def add(
+        self: Self,
+        key: Hashable,
+        failure: Any,
+        /,
+    ) -> None:
+        record = self._cache.peek(key)
+        count = record[0] + 1 if record is not None else 0
+
+        ttl = self._ttl * self._backoff**count
+
+        if self._max_ttl is not None:
+            ttl = min(ttl, self._max_ttl)
+
+        self._cache[key] = [count, time.monotonic() + ttl, failure]
+
+    def discard(
+        self: Self,
+        key: Hashable,
+        /,
+    ) -> None:
+        self._cache.pop(key, None)
+
+
+def _identity(
+    object: _T,
+    /,
+) -> _T:
+    return object
+
+
+def _weigh_entry(
+    entry: list[Any],
+    /,
+) -> int:
+    # NOTE: replay entries are weighed empty and then grow through
+    #       SizedCache.add_weight as their items are produced
+    return sys.getsizeof(entry) + sys.getsizeof(entry[1])
+
+
+_atomic_types = (bool, bytearray, bytes, complex, float, int, range, str, type(None))
+_opaque_types = (type, types.BuiltinFunctionType, types.FunctionType, types.MethodType, types.ModuleType)
+
+
+def _estimate_size(
+    object: Any,
+    /,
 ) -> int:
-    return hash((args, frozenset(kwargs.items())))
+    # NOTE: an approximate deep sys.getsizeof which follows builtin
+    #       containers and instance __dict__s but not classes, modules or
+    #       functions, whose reachable graph is shared by everything
+    seen: set[int] = set()
+    stack = [object]
+
+    size = 0
+    while stack:
+        object = stack.pop()
+
+        if id(object) in seen:
+            continue
+
+        seen.add(id(object))
+        size += sys.getsizeof(object)
+
+        if isinstance(object, _atomic_types):
+            continue
+
+        if isinstance(object, dict):
+            stack.extend(object.keys())
+            stack.extend(object.values())
+        elif isinstance(object, (collections.deque, frozenset, list, set, tuple)):
+            stack.extend(object)
+        elif isinstance(object, asyncio.Future):
+            # NOTE: cache_coroutine caches futures, which hold the results
+            if object.done() and not object.cancelled():
+                stack.append(object.exception() or object.result())
+        elif not isinstance(object, _opaque_types):
+            try:
+                stack.append(vars(object))
+            except TypeError:
+                pass
+
+    return size
+
+
+def _make_buffer(
+    typecode: str | None,
+    /,
+) -> list[Any] | array.array[Any]:
+    return list() if typecode is None else array.array(typecode)
+
+
+def _make_chunks(
+    items: Iterable[Any],
+    chunk_size: int | None,
+    typecode: str | None,
+    /,
+) -> list[Any]:
+    if chunk_size is None:
+        return [list(items) if typecode is None else array.array(typecode, items)]
+
+    iterator = iter(items)
+    chunks = list()
+
+    while True:
+        chunk = _make_buffer(typecode)
+        chunk.extend(itertools.islice(iterator, chunk_size))
+
+        if not chunk:
+            return chunks
+
+        chunks.append(chunk)
+
+
+def _make_entry(
+    items: Iterable[Any],
+    chunk_size: int | None,
+    typecode: str | None,
+    max_items: int | None,
+    restart: Callable[[], Iterator[Any]],
+    /,
+) -> list[Any]:
+    # NOTE: builds a finished entry, truncated to max_items like one
+    #       built by _replay would be
+    if max_items is not None:
+        items = list(itertools.islice(items, max_items + 1))
+
+        if len(items) > max_items:
+            return [MISSING, _make_chunks(items[:max_items], chunk_size, typecode), True, None, restart, None]
+
+    return [MISSING, _make_chunks(items, chunk_size, typecode), True, None, None, None]
+
+
+def _flatten_chunks(
+    chunks: list[Any],
+    /,
+) -> list[Any]:
+    if len(chunks) == 1 and type(chunks[0]) is list:
+        return chunks[0]
+
+    return list(itertools.chain.from_iterable(chunks))
+
+
+def _replay(
+    entry: list[Any],
+    cache: Cache[Hashable, list[Any]],
+    key: Hashable,
+    weigh: Callable[[Any], int] | None,
+    store: DiskStore | None,
+    store_key: bytes | None,
+    chunk_size: int | None,
+    typecode: str | None,
+    max_items: int | None,
+    fail: Callable[[Hashable, list[Any]], None] | None,
+    /,
+) -> Generator[Any, None, None]:
+    # NOTE: entry is [generator, chunks, done, lock, restart, failure].
+    #       every consumer replays the chunks by position and only the
+    #       consumer which has caught up advances the shared generator, so
+    #       any number of interleaved consumers each see every item
+    #       exactly once. chunks are lists or arrays of chunk_size items, or a
+    #       single unbounded one without a chunk_size, and a full chunk
+    #       is never appended to again, so it is replayed in one go.
+    #
+    #       once max_items are buffered, the consumer which has caught up
+    #       takes over the shared generator and streams the rest live,
+    #       while later consumers stream the rest from a new generator
+    #       made by restart.
+    #
+    #       if the shared generator raises, every consumer replays the
+    #       items before the exception and then raises it, and the entry
+    #       is dropped from the cache and passed to fail. failure holds the
+    #       exception with its traceback as it was first raised, which is
+    #       restored on every raise so that the traceback does not grow
+    chunks: list[Any] = entry[1]
+    lock: threading.Lock | None = entry[3]
+
+    c = 0
+    i = 0
+    while True:
+        while c < len(chunks):
+            chunk = chunks[c]
+
+            if i == 0 and len(chunk) == chunk_size:
+                yield from chunk
+                c += 1
+                continue
+
+            while i < len(chunk):
+                yield chunk[i]
+                i += 1
+
+            if len(chunk) != chunk_size:
+                break
+
+            c += 1
+            i = 0
+
+        if entry[2]:
+            if entry[5] is not None:
+                exception, traceback = entry[5]
+                raise exception.with_traceback(traceback)
+
+            if entry[4] is not None:
+                yield from itertools.islice(entry[4](), c * (chunk_size or 0) + i, None)
+
+            return
+
+        if lock is not None:
+            lock.acquire()
+
+        try:
+            if (c < len(chunks) and i < len(chunks[c])) or entry[2]:
+                continue
+
+            if max_items is not None and c * (chunk_size or 0) + i >= max_items:
+                generator = entry[0]
+                entry[0] = MISSING
+                entry[2] = True
+                entry[3] = None
+            else:
+                generator = None
+
+                try:
+                    item = next(entry[0])
+                except StopIteration:
+                    entry[0] = MISSING
+                    entry[2] = True
+                    entry[3] = None
+                    entry[4] = None
+
+                    if store is not None and store_key is not None:
+                        store.set(store_key, _flatten_chunks(chunks))
+
+                    return
+                except BaseException as e:
+                    entry[0] = MISSING
+                    entry[2] = True
+                    entry[3] = None
+                    entry[4] = None
+                    entry[5] = (e, e.__traceback__)
+
+                    if cache.peek(key) is entry:
+                        del cache[key]
+
+                    if fail is not None and isinstance(e, Exception):
+                        fail(key, entry)
+
+                    raise
+
+                if not chunks or len(chunks[-1]) == chunk_size:
+                    chunks.append(_make_buffer(typecode))
+
+                chunks[-1].append(item)
+
+                # NOTE: the entry may since have been evicted and the key
+                #       reused, in which case the growth is not charged
+                if weigh is not None and cache.peek(key) is entry:
+                    cache.add_weight(key, weigh(item))  # type: ignore  # weighted caches are SizedCache
+        finally:
+            if lock is not None:
+                lock.release()
+
+        if generator is not None:
+            yield from generator
+            return
 
 
 if TYPE_CHECKING:
@@ -38,12 +784,40 @@ if TYPE_CHECKING:
     def cache_generator(
         *,
         max_size: int | None = ...,
+        policy: _Policy = ...,
+        ttl: float | None = ...,
+        thread_safe: bool = ...,
+        max_weight: int | None = ...,
+        weigher: Callable[[Any], int] = ...,
+        typed: bool = ...,
+        normalize: bool = ...,
+        key: Callable[..., Hashable] | None = ...,
+        store: DiskStore | None = ...,
+        refresh_after: float | None = ...,
+        max_items: int | None = ...,
+        chunk_size: int | None = ...,
+        typecode: str | None = ...,
+        error_ttl: float | None = ...,
+        error_backoff: float = ...,
+        max_error_ttl: float | None = ...,
     ) -> Callable[[_GeneratorFunc[_P, _T]], _GeneratorFunc[_P, _T]]: ...
 
     @overload
     def cache_generator(
         *,
         max_size: int | None = ...,
+        policy: _Policy = ...,
+        ttl: float | None = ...,
+        thread_safe: bool = ...,
+        max_weight: int | None = ...,
+        weigher: Callable[[Any], int] = ...,
+        typed: bool = ...,
+        normalize: bool = ...,
+        key: Callable[..., Hashable] | None = ...,
+        refresh_after: float | None = ...,
+        error_ttl: float | None = ...,
+        error_backoff: float = ...,
+        max_error_ttl: float | None = ...,
         wrapper: Callable[[_Generator[_T]], _U],
     ) -> Callable[[_GeneratorFunc[_P, _T]], Callable[_P, _U]]: ...
 
@@ -53,146 +827,3411 @@ def cache_generator(
     /,
     *,
     max_size: int | None = MISSING,
+    policy: _Policy = MISSING,
+    ttl: float | None = MISSING,
+    thread_safe: bool = MISSING,
+    max_weight: int | None = MISSING,
+    weigher: Callable[[Any], int] = MISSING,
+    typed: bool = MISSING,
+    normalize: bool = MISSING,
+    key: Callable[..., Hashable] | None = MISSING,
+    store: DiskStore | None = MISSING,
+    refresh_after: float | None = MISSING,
+    max_items: int | None = MISSING,
+    chunk_size: int | None = MISSING,
+    typecode: str | None = MISSING,
+    error_ttl: float | None = MISSING,
+    error_backoff: float = MISSING,
+    max_error_ttl: float | None = MISSING,
     wrapper: Callable[[_Generator[_T]], _U] = MISSING,
 ) -> _GeneratorFunc[_P, _T] | Callable[[_GeneratorFunc[_P, _T]], _GeneratorFunc[_P, _T]] | Callable[[_GeneratorFunc[_P, _T]], Callable[_P, _U]]:
+    """
+    |decorator_dynamic|
+
+    Caches the items of a generator function.
+
+    Calls with the same arguments share a single iteration of the
+    wrapped generator, each replaying every item and advancing the
+    iteration only once it has caught up with it. Iterations which
+    raise are not cached, but the items before the failure are still
+    replayed to every call sharing them.
+
+
+    Parameters
+    ----------
+    max_size: :class:`int` | None
+        The maximum number of results to cache, or ``None`` or ``-1``
+        for no limit. Defaults to ``1024``.
+    policy: Literal["lfu", "lru", "tinylfu"]
+        The eviction policy. Defaults to ``"lru"``.
+    ttl: :class:`float` | None
+        The lifetime of each result in seconds, or ``None`` for results
+        which never expire. Defaults to ``None``.
+    thread_safe: :class:`bool`
+        Whether the cache and each shared iteration may be used from
+        multiple threads at once. Defaults to ``False``.
+    max_weight: :class:`int` | None
+        The maximum total weight of the cached items, or ``None`` for
+        no limit. Results are weighed as their iteration advances, and
+        evicted by ``policy`` to make room. Not supported
+        with ``thread_safe`` or the ``"tinylfu"`` policy. Defaults to
+        ``None``.
+    weigher: Callable[[Any], :class:`int`]
+        A callable given each item which returns its weight. Defaults
+        to an estimate of the item's size in bytes.
+    typed: :class:`bool`
+        Whether arguments of different types are cached separately,
+        e.g. ``f(1)`` and ``f(1.0)``. Defaults to ``False``.
+    normalize: :class:`bool`
+        Whether arguments are bound against the signature of the
+        wrapped function, so that e.g. ``f(1)``, ``f(a=1)`` and
+        ``f(1, b=DEFAULT)`` share a result. Defaults to ``False``.
+    key: Callable[..., Hashable] | None
+        A callable given the arguments of each call which returns its
+        cache key. Defaults to ``None``.
+    store: :class:`DiskStore` | None
+        A store to which the items of each completed iteration are
+        persisted, and from which they are read back when not in the
+        cache, including by other processes. Results whose key cannot
+        be pickled are not persisted. Not supported with ``ttl`` or
+        ``wrapper``. Defaults to ``None``.
+    refresh_after: :class:`float` | None
+        The age in seconds after which a result is stale. A stale
+        result is still replayed, but the first call to see it starts
+        a refresh in a background thread, with the refreshed result
+        replayed from the next call on. Refreshes and failed refreshes
+        are counted in ``__utility_refreshes__`` and
+        ``__utility_refresh_failures__``. Must be less than ``ttl``,
+        after which a result must be recomputed. Defaults to ``None``.
+    max_items: :class:`int` | None
+        The maximum number of items to cache from each iteration, or
+        ``None`` for no limit. Calls which consume past it continue
+        with a new iteration of the wrapped generator, which skips the
+        cached items. Not supported with ``wrapper``. Defaults to
+        ``None``.
+    chunk_size: :class:`int` | None
+        The number of items stored per chunk, or ``None`` to store
+        them all in one, so that a long iteration never resizes one
+        large buffer. Not supported with ``wrapper``. Defaults to
+        ``None``.
+    typecode: :class:`str` | None
+        A typecode of :mod:`array`, to store items compactly in arrays
+        rather than in lists. Every item must fit it. Not supported
+        with ``wrapper``. Defaults to ``None``.
+    error_ttl: :class:`float` | None
+        The number of seconds for which a failure is cached, and
+        replayed to calls with the same arguments rather than
+        recomputed, or ``None`` for failures which are not cached.
+        Replayed failures are counted in ``__utility_negative_hits__``.
+        Defaults to ``None``.
+    error_backoff: :class:`float`
+        The factor by which the period a failure is cached grows with
+        each consecutive failure of the same arguments. Must be at
+        least ``1``. Defaults to ``1.0``.
+    max_error_ttl: :class:`float` | None
+        The maximum number of seconds for which a failure is cached,
+        or ``None`` for no limit. Requires ``error_ttl``. Defaults to
+        ``None``.
+    wrapper: Callable[[Generator[Any, None, Any]], Any]
+        A callable given the generator of each call whose result is
+        cached instead, e.g. :class:`list` or :class:`tuple`.
+    """
+
     max_size = max_size if max_size is not MISSING else 1024
+    policy = policy if policy is not MISSING else "lru"
+    ttl = ttl if ttl is not MISSING else None
+    thread_safe = thread_safe if thread_safe is not MISSING else False
+    max_weight = max_weight if max_weight is not MISSING else None
+    typed = typed if typed is not MISSING else False
+    normalize = normalize if normalize is not MISSING else False
+    key = key if key is not MISSING else None
+    store = store if store is not MISSING else None
+    refresh_after = refresh_after if refresh_after is not MISSING else None
+    max_items = max_items if max_items is not MISSING else None
+    chunk_size = chunk_size if chunk_size is not MISSING else None
+    typecode = typecode if typecode is not MISSING else None
+    error_ttl = error_ttl if error_ttl is not MISSING else None
+    error_backoff = error_backoff if error_backoff is not MISSING else 1.0
+    max_error_ttl = max_error_ttl if max_error_ttl is not MISSING else None
 
-    if isinstance(max_size, int):
-        if max_size < -1 or max_size == 0:
-            raise ValueError("max_size must be None, -1, or a positive integer")
+    _check_cache_options(max_size, policy, ttl, thread_safe, max_weight)
+    _check_key_options(key, normalize, typed)
+    _check_refresh_options(refresh_after, ttl)
+    _check_error_options(error_ttl, error_backoff, max_error_ttl)
+
+    # NOTE: entries in store never expire, so an expired entry would be
+    #       read back from it rather than recomputed
+    if store is not None and ttl is not None:
+        raise ValueError("store is not supported with ttl")
+
+    if wrapper is not MISSING:
+        if store is not None:
+            raise ValueError("store is not supported with wrapper")
+
+        if max_items is not None or chunk_size is not None or typecode is not None:
+            raise ValueError("max_items, chunk_size and typecode are not supported with wrapper")
+
+    if max_items is not None and max_items < 0:
+        raise ValueError("max_items must be None or 0 or a positive integer")
+
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError("chunk_size must be None or a positive integer")
+
+    if typecode is not None and typecode not in array.typecodes:
+        raise ValueError(f"typecode must be None or one of {', '.join(map(repr, array.typecodes))}")
+
+    if wrapper is not MISSING:
+
+        def decorator_wrapper(
+            wrapped: _GeneratorFunc[_P, _T],
+            /,
+        ) -> Callable[_P, _U]:
+            cache: Cache[Hashable, _U] = _make_cache(max_size, policy, ttl, thread_safe, max_weight, weigher)
+            make_key = _make_key_function(wrapped, key, normalize, typed)
+
+            def inner(
+                *args: _P.args,
+                **kwargs: _P.kwargs,
+            ) -> _U:
+                key = make_key(args, kwargs)
+                value = cache.get(key, MISSING)
+
+                if value is MISSING:
+                    if errors is not None:
+                        failed = errors.get(key)
+
+                        if failed is not MISSING:
+                            inner.__utility_negative_hits__ += 1
+
+                            # NOTE: the traceback is restored as for replay
+                            exception, traceback = failed
+                            raise exception.with_traceback(traceback)
+
+                        try:
+                            value = wrapper(wrapped(*args, **kwargs))
+                        except Exception as e:
+                            errors.add(key, (e, e.__traceback__))
+                            raise
+
+                        errors.discard(key)
+                    else:
+                        value = wrapper(wrapped(*args, **kwargs))
+
+                    cache[key] = value
+
+                    if refresher is not None:
+                        refresher.stamp(key)
+                elif refresher is not None:
+                    refreshed = refresher.poll(key, args, kwargs)
+
+                    if refreshed is not MISSING:
+                        value = refreshed
+                        cache[key] = value
+
+                return value
+
+            def refresh(
+                key: Hashable,
+                args: tuple[Any, ...],
+                kwargs: dict[str, Any],
+                /,
+            ) -> None:
+                _get_refresh_executor().submit(refresher.run, key, lambda: wrapper(wrapped(*args, **kwargs)))  # type: ignore  # refresher is set
+
+            refresher = _Refresher(inner, cache, refresh_after, refresh) if refresh_after is not None else None
+            errors = _Errors(max_size, thread_safe, error_ttl, error_backoff, max_error_ttl) if error_ttl is not None else None
+
+            inner.__utility_cache__ = cache
+            inner.__utility_negative_hits__ = 0
+            register_cache(cache, f"{wrapped.__module__}.{wrapped.__qualname__}")
+
+            return inner
+
+        return decorator_wrapper
+
+    else:
+
+        def decorator(
+            wrapped: _GeneratorFunc[_P, _T],
+            /,
+        ) -> _GeneratorFunc[_P, _T]:
+            weigh = (weigher if weigher is not MISSING else _estimate_size) if max_weight is not None else None
+            cache: Cache[Hashable, list[Any]] = _make_cache(max_size, policy, ttl, thread_safe, max_weight, _weigh_entry)
+            make_key = _make_key_function(wrapped, key, normalize, typed)
+            name = f"{wrapped.__module__}.{wrapped.__qualname__}"
+
+            def inner(
+                *args: _P.args,
+                **kwargs: _P.kwargs,
+            ) -> Generator[_T, None, Any]:
+                key = make_key(args, kwargs)
+
+                # NOTE: the entry is held for the whole iteration, so that
+                #       it stays usable even if the cache evicts or expires
+                #       it in the meantime
+                store_key = None
+                entry = cache.get(key)
+
+                if entry is None:
+                    if errors is not None:
+                        failed = errors.get(key)
+
+                        if failed is not MISSING:
+                            inner.__utility_negative_hits__ += 1
+
+                            # NOTE: replays the items before the failure and
+                            #       then raises it, as for its first consumers
+                            yield from _replay(failed, cache, key, None, None, None, chunk_size, typecode, None, None)
+
+                    items = MISSING
+
+                    if store is not None:
+                        store_key = _make_stable_key(name, key)
+
+                        if store_key is not None:
+                            items = store.get(store_key)
+
+                    if items is MISSING:
+                        restart = functools.partial(wrapped, *args, **kwargs) if max_items is not None else None
+                        entry = [wrapped(*args, **kwargs), list(), False, threading.Lock() if thread_safe else None, restart, None]
+                        cache[key] = entry
+                    else:
+                        entry = [MISSING, _make_chunks(items, chunk_size, typecode), True, None, None, None]
+                        cache[key] = entry
+
+                        if weigh is not None:
+                            cache.add_weight(key, sum(map(weigh, items)))  # type: ignore  # weighted caches are SizedCache
+
+                    if refresher is not None:
+                        refresher.stamp(key)
+                elif refresher is not None:
+                    refreshed = refresher.poll(key, args, kwargs)
+
+                    if refreshed is not MISSING:
+                        entry = refreshed
+                        cache[key] = entry
+
+                        if weigh is not None:
+                            cache.add_weight(key, sum(map(weigh, itertools.chain.from_iterable(entry[1]))))  # type: ignore  # weighted caches are SizedCache
+
+                        if store is not None and entry[4] is None:
+                            store_key = _make_stable_key(name, key)
+
+                            if store_key is not None:
+                                store.set(store_key, _flatten_chunks(entry[1]))
+
+                            store_key = None
+
+                yield from _replay(entry, cache, key, weigh, store, store_key, chunk_size, typecode, max_items, errors.add if errors is not None else None)
+
+                if errors is not None:
+                    errors.discard(key)
+
+            def refresh(
+                key: Hashable,
+                args: tuple[Any, ...],
+                kwargs: dict[str, Any],
+                /,
+            ) -> None:
+                restart = functools.partial(wrapped, *args, **kwargs)
+
+                def compute() -> list[Any]:
+                    return _make_entry(restart(), chunk_size, typecode, max_items, restart)
+
+                _get_refresh_executor().submit(refresher.run, key, compute)  # type: ignore  # refresher is set
+
+            refresher = _Refresher(inner, cache, refresh_after, refresh) if refresh_after is not None else None
+            errors = _Errors(max_size, thread_safe, error_ttl, error_backoff, max_error_ttl) if error_ttl is not None else None
+
+            inner.__utility_cache__ = cache
+            inner.__utility_negative_hits__ = 0
+            register_cache(cache, f"{wrapped.__module__}.{wrapped.__qualname__}")
+
+            return inner
+
+        if wrapped is MISSING:
+            return decorator
+
+        return decorator(wrapped)
+
+
+if TYPE_CHECKING:
+
+    @overload
+    def cache_coroutine(
+        wrapped: _CoroutineFunc[_P, _T],
+        /,
+    ) -> _CoroutineFunc[_P, _T]: ...
+
+    @overload
+    def cache_coroutine(
+        *,
+        max_size: int | None = ...,
+        policy: _Policy = ...,
+        ttl: float | None = ...,
+        typed: bool = ...,
+        normalize: bool = ...,
+        key: Callable[..., Hashable] | None = ...,
+        refresh_after: float | None = ...,
+    ) -> Callable[[_CoroutineFunc[_P, _T]], _CoroutineFunc[_P, _T]]: ...
+
+
+def cache_coroutine(
+    wrapped: _CoroutineFunc[_P, _T] = MISSING,
+    /,
+    *,
+    max_size: int | None = MISSING,
+    policy: _Policy = MISSING,
+    ttl: float | None = MISSING,
+    typed: bool = MISSING,
+    normalize: bool = MISSING,
+    key: Callable[..., Hashable] | None = MISSING,
+    refresh_after: float | None = MISSING,
+) -> _CoroutineFunc[_P, _T] | Callable[[_CoroutineFunc[_P, _T]], _CoroutineFunc[_P, _T]]:
+    """
+    |decorator_dynamic|
+
+    Caches the results of a coroutine function.
+
+    Concurrent calls with the same arguments share a single execution
+    of the wrapped coroutine function, with all but the first counted
+    in ``__utility_coalesced__``. Calls which raise are not cached.
+
+
+    Parameters
+    ----------
+    max_size: :class:`int` | None
+        The maximum number of results to cache, or ``None`` or ``-1``
+        for no limit. Defaults to ``1024``.
+    policy: Literal["lfu", "lru", "tinylfu"]
+        The eviction policy. Defaults to ``"lru"``.
+    ttl: :class:`float` | None
+        The lifetime of each result in seconds, or ``None`` for results
+        which never expire. Defaults to ``None``.
+    typed: :class:`bool`
+        Whether arguments of different types are cached separately,
+        e.g. ``f(1)`` and ``f(1.0)``. Defaults to ``False``.
+    normalize: :class:`bool`
+        Whether arguments are bound against the signature of the
+        wrapped function, so that e.g. ``f(1)``, ``f(a=1)`` and
+        ``f(1, b=DEFAULT)`` share a result. Defaults to ``False``.
+    key: Callable[..., Hashable] | None
+        A callable given the arguments of each call which returns its
+        cache key. Defaults to ``None``.
+    refresh_after: :class:`float` | None
+        The age in seconds after which a result is stale. A stale
+        result is still returned, but the first call to see it starts
+        a refresh on the running event loop, with the refreshed result
+        returned from the next call on. Refreshes and failed refreshes
+        are counted in ``__utility_refreshes__`` and
+        ``__utility_refresh_failures__``. Must be less than ``ttl``,
+        after which a result must be recomputed. Defaults to ``None``.
+    """
+
+    max_size = max_size if max_size is not MISSING else 1024
+    policy = policy if policy is not MISSING else "lru"
+    ttl = ttl if ttl is not MISSING else None
+    typed = typed if typed is not MISSING else False
+    normalize = normalize if normalize is not MISSING else False
+    key = key if key is not MISSING else None
+    refresh_after = refresh_after if refresh_after is not MISSING else None
+
+    _check_cache_options(max_size, policy, ttl, False, None)
+    _check_key_options(key, normalize, typed)
+    _check_refresh_options(refresh_after, ttl)
+
+    def decorator(
+        wrapped: _CoroutineFunc[_P, _T],
+        /,
+    ) -> _CoroutineFunc[_P, _T]:
+        cache: Cache[Hashable, asyncio.Future[_T]] = _make_cache(max_size, policy, ttl, False)
+        make_key = _make_key_function(wrapped, key, normalize, typed)
+
+        async def inner(
+            *args: _P.args,
+            **kwargs: _P.kwargs,
+        ) -> _T:
+            key = make_key(args, kwargs)
+            future = cache.get(key)
+
+            if future is None:
+                future = asyncio.ensure_future(wrapped(*args, **kwargs))
+                future.add_done_callback(functools.partial(_discard_failed, cache, key))
+                cache[key] = future
+
+                if refresher is not None:
+                    refresher.stamp(key)
+            else:
+                if refresher is not None:
+                    refreshed = refresher.poll(key, args, kwargs)
+
+                    if refreshed is not MISSING:
+                        future = refreshed
+                        cache[key] = future
+
+                if future.done():
+                    return future.result()
+
+                inner.__utility_coalesced__ += 1
+
+            # NOTE: shield the shared execution, so that cancelling one
+            #       caller does not cancel it for every other caller
+            return await asyncio.shield(future)
+
+        async def compute(
+            args: tuple[Any, ...],
+            kwargs: dict[str, Any],
+            /,
+        ) -> asyncio.Future[_T]:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(await wrapped(*args, **kwargs))
+
+            return future
+
+        def refresh(
+            key: Hashable,
+            args: tuple[Any, ...],
+            kwargs: dict[str, Any],
+            /,
+        ) -> None:
+            task = asyncio.ensure_future(refresher.run_async(key, compute(args, kwargs)))  # type: ignore  # refresher is set
+
+            # NOTE: the event loop only holds weak references to tasks
+            _refresh_tasks.add(task)
+            task.add_done_callback(_refresh_tasks.discard)
+
+        refresher = _Refresher(inner, cache, refresh_after, refresh) if refresh_after is not None else None
+
+        inner.__utility_cache__ = cache
+        inner.__utility_coalesced__ = 0
+        register_cache(cache, f"{wrapped.__module__}.{wrapped.__qualname__}")
+
+        return inner
+
+    if wrapped is MISSING:
+        return decorator
+
+    return decorator(wrapped)
+
+
+async def _replay_async(
+    entry: list[Any],
+    cache: Cache[Hashable, list[Any]],
+    key: Hashable,
+    /,
+) -> AsyncGenerator[Any, None]:
+    # NOTE: entry is [generator, items, done, task, exception]. like
+    #       _replay, but the consumer which has caught up advances the
+    #       shared generator in a task, which every other consumer which
+    #       catches up awaits instead of advancing it again
+    items: list[Any] = entry[1]
+
+    i = 0
+    while True:
+        while i < len(items):
+            yield items[i]
+            i += 1
+
+        if entry[2]:
+            if entry[4] is not None:
+                raise entry[4]
+
+            return
+
+        task = entry[3]
+
+        if task is None:
+            task = asyncio.ensure_future(_advance_async(entry, cache, key))
+            entry[3] = task
+
+        # NOTE: shield the shared advance, so that cancelling one
+        #       consumer does not cancel it for every other consumer
+        await asyncio.shield(task)
+
+
+async def _advance_async(
+    entry: list[Any],
+    cache: Cache[Hashable, list[Any]],
+    key: Hashable,
+    /,
+) -> None:
+    try:
+        item = await entry[0].__anext__()
+    except StopAsyncIteration:
+        entry[0] = MISSING
+        entry[2] = True
+    except BaseException as e:
+        entry[0] = MISSING
+        entry[2] = True
+        entry[4] = e
+
+        # NOTE: consumers which already hold the entry see the
+        #       exception, later calls start over
+        if cache.peek(key) is entry:
+            del cache[key]
+
+        if not isinstance(e, Exception):
+            raise
+    else:
+        entry[1].append(item)
+    finally:
+        entry[3] = None
+
+
+if TYPE_CHECKING:
+
+    @overload
+    def cache_async_generator(
+        wrapped: _AsyncGeneratorFunc[_P, _T],
+        /,
+    ) -> _AsyncGeneratorFunc[_P, _T]: ...
+
+    @overload
+    def cache_async_generator(
+        *,
+        max_size: int | None = ...,
+        policy: _Policy = ...,
+        ttl: float | None = ...,
+        typed: bool = ...,
+        normalize: bool = ...,
+        key: Callable[..., Hashable] | None = ...,
+    ) -> Callable[[_AsyncGeneratorFunc[_P, _T]], _AsyncGeneratorFunc[_P, _T]]: ...
+
+    @overload
+    def cache_async_generator(
+        *,
+        max_size: int | None = ...,
+        policy: _Policy = ...,
+        ttl: float | None = ...,
+        typed: bool = ...,
+        normalize: bool = ...,
+        key: Callable[..., Hashable] | None = ...,
+        wrapper: Callable[[_AsyncGenerator[_T]], Awaitable[_U]],
+    ) -> Callable[[_AsyncGeneratorFunc[_P, _T]], _CoroutineFunc[_P, _U]]: ...
+
+    @overload
+    def cache_async_generator(
+        wrapped: _AsyncGeneratorFunc[_P, _T],
+        /,
+        *,
+        max_size: int | None = ...,
+        policy: _Policy = ...,
+        ttl: float | None = ...,
+        typed: bool = ...,
+        normalize: bool = ...,
+        key: Callable[..., Hashable] | None = ...,
+        wrapper: Callable[[_AsyncGenerator[_T]], Awaitable[_U]],
+    ) -> _CoroutineFunc[_P, _U]: ...
+
+
+def cache_async_generator(
+    wrapped: _AsyncGeneratorFunc[_P, _T] = MISSING,
+    /,
+    *,
+    max_size: int | None = MISSING,
+    policy: _Policy = MISSING,
+    ttl: float | None = MISSING,
+    typed: bool = MISSING,
+    normalize: bool = MISSING,
+    key: Callable[..., Hashable] | None = MISSING,
+    wrapper: Callable[[_AsyncGenerator[_T]], Awaitable[_U]] = MISSING,
+) -> _AsyncGeneratorFunc[_P, _T] | Callable[[_AsyncGeneratorFunc[_P, _T]], _AsyncGeneratorFunc[_P, _T]] | Callable[[_AsyncGeneratorFunc[_P, _T]], _CoroutineFunc[_P, _U]] | _CoroutineFunc[_P, _U]:
+    """
+    |decorator_dynamic|
+
+    Caches the items of an async generator function.
+
+    Concurrent calls with the same arguments share a single iteration
+    of the wrapped async generator, each replaying every item. A call
+    which catches up with the iteration awaits its next item rather
+    than starting another, and cancelling it does not cancel the
+    iteration for the others. Iterations which raise are not cached.
+
+
+    Parameters
+    ----------
+    max_size: :class:`int` | None
+        The maximum number of results to cache, or ``None`` or ``-1``
+        for no limit. Defaults to ``1024``.
+    policy: Literal["lfu", "lru", "tinylfu"]
+        The eviction policy. Defaults to ``"lru"``.
+    ttl: :class:`float` | None
+        The lifetime of each result in seconds, or ``None`` for results
+        which never expire. Defaults to ``None``.
+    typed: :class:`bool`
+        Whether arguments of different types are cached separately,
+        e.g. ``f(1)`` and ``f(1.0)``. Defaults to ``False``.
+    normalize: :class:`bool`
+        Whether arguments are bound against the signature of the
+        wrapped function, so that e.g. ``f(1)``, ``f(a=1)`` and
+        ``f(1, b=DEFAULT)`` share a result. Defaults to ``False``.
+    key: Callable[..., Hashable] | None
+        A callable given the arguments of each call which returns its
+        cache key. Defaults to ``None``.
+    wrapper: Callable[[AsyncGenerator[Any, None]], Awaitable[Any]]
+        A callable given the async generator of each call whose awaited
+        result is cached instead, as with :func:`cache_coroutine`.
+    """
+
+    max_size = max_size if max_size is not MISSING else 1024
+    policy = policy if policy is not MISSING else "lru"
+    ttl = ttl if ttl is not MISSING else None
+    typed = typed if typed is not MISSING else False
+    normalize = normalize if normalize is not MISSING else False
+    key = key if key is not MISSING else None
+
+    _check_cache_options(max_size, policy, ttl, False, None)
+    _check_key_options(key, normalize, typed)
+
+    if wrapper is not MISSING:
+
+        def decorator_wrapper(
+            wrapped: _AsyncGeneratorFunc[_P, _T],
+            /,
+        ) -> _CoroutineFunc[_P, _U]:
+            @functools.wraps(wrapped)
+            async def call(
+                *args: _P.args,
+                **kwargs: _P.kwargs,
+            ) -> _U:
+                return await wrapper(wrapped(*args, **kwargs))
+
+            return cache_coroutine(call, max_size=max_size, policy=policy, ttl=ttl, typed=typed, normalize=normalize, key=key)  # type: ignore  # overloads
+
+        if wrapped is MISSING:
+            return decorator_wrapper
+
+        return decorator_wrapper(wrapped)
+
+    def decorator(
+        wrapped: _AsyncGeneratorFunc[_P, _T],
+        /,
+    ) -> _AsyncGeneratorFunc[_P, _T]:
+        cache: Cache[Hashable, list[Any]] = _make_cache(max_size, policy, ttl, False)
+        make_key = _make_key_function(wrapped, key, normalize, typed)
+
+        async def inner(
+            *args: _P.args,
+            **kwargs: _P.kwargs,
+        ) -> AsyncGenerator[_T, None]:
+            key = make_key(args, kwargs)
+            entry = cache.get(key)
+
+            if entry is None:
+                entry = [wrapped(*args, **kwargs), list(), False, None, None]
+                cache[key] = entry
+
+            async for item in _replay_async(entry, cache, key):
+                yield item
+
+        inner.__utility_cache__ = cache
+        register_cache(cache, f"{wrapped.__module__}.{wrapped.__qualname__}")
+
+        return inner
+
+    if wrapped is MISSING:
+        return decorator
+
+    return decorator(wrapped)
+
+
+class _CachedMethod:
+    # NOTE: a descriptor which decorates each instance's method on first
+    #       access, storing the result in the instance's __dict__, or for
+    #       instances without one in a dictionary keyed by their id, so
+    #       that equal instances do not share a cache, from which they are
+    #       removed as they die. the decorated function only holds a weak
+    #       reference to the instance, which
+    #       is instead kept alive by the bound method returned on each
+    #       access, so that the instance, and with it its cache, is
+    #       usually freed by refcounting. a cached generator which was
+    #       only partly consumed still refers to the instance from its
+    #       frame though, and that cycle is only freed by the garbage
+    #       collector
+
+    __slots__ = ("_wrapped", "_decorator", "_signature", "_attribute", "_instances", "__dict__")
+
+    def __init__(
+        self: Self,
+        wrapped: Callable[..., Any],
+        decorator: Callable[[Callable[..., Any]], Callable[..., Any]],
+        /,
+    ) -> None:
+        signature = inspect.signature(wrapped)
+
+        self._wrapped: Callable[..., Any] = wrapped
+        self._decorator: Callable[[Callable[..., Any]], Callable[..., Any]] = decorator
+        self._signature: inspect.Signature = signature.replace(parameters=list(signature.parameters.values())[1:])
+        self._attribute: str = f"__utility_cache_method_{wrapped.__name__}"
+        self._instances: dict[int, Callable[..., Any]] = dict()
+
+        functools.update_wrapper(self, wrapped)  # type: ignore  # copies into __dict__
+
+    def __set_name__(
+        self: Self,
+        owner: type[Any],
+        name: str,
+        /,
+    ) -> None:
+        self._attribute = f"__utility_cache_method_{name}"
+
+    def __get__(
+        self: Self,
+        instance: Any,
+        owner: type[Any] | None = None,
+        /,
+    ) -> Any:
+        if instance is None:
+            return self
+
+        try:
+            namespace = instance.__dict__
+        except AttributeError:
+            namespace = None
+            method = self._instances.get(id(instance))
+        else:
+            method = namespace.get(self._attribute)
+
+        if method is None:
+            method = self._bind(instance)
+
+            if namespace is not None:
+                namespace[self._attribute] = method
+            else:
+                self._instances[id(instance)] = method
+
+                finalizer = weakref.finalize(instance, self._instances.pop, id(instance), None)
+                finalizer.atexit = False
+
+        return types.MethodType(method, instance)
+
+    def _bind(
+        self: Self,
+        instance: Any,
+        /,
+    ) -> Callable[..., Any]:
+        wrapped = self._wrapped
+        reference = weakref.ref(instance)
+
+        def call(
+            *args: Any,
+            **kwargs: Any,
+        ) -> Any:
+            return bind_function(wrapped, reference())(*args, **kwargs)
+
+        call.__module__ = wrapped.__module__
+        call.__name__ = wrapped.__name__
+        call.__qualname__ = wrapped.__qualname__
+        call.__doc__ = wrapped.__doc__
+        call.__signature__ = self._signature
+
+        decorated = self._decorator(call)
+
+        # NOTE: per-instance caches are not listed in the statistics,
+        #       which would otherwise hold one row per live instance
+        _unregister_cache(decorated.__utility_cache__)
+
+        # NOTE: replay and coroutines run lazily, so the instance is
+        #       held by them until they are done
+        if inspect.isgeneratorfunction(decorated):
+
+            def generator_method(
+                instance: Any,
+                /,
+                *args: Any,
+                **kwargs: Any,
+            ) -> Any:
+                yield from decorated(*args, **kwargs)
+
+            method = generator_method
+        elif inspect.isasyncgenfunction(decorated):
+
+            async def async_generator_method(
+                instance: Any,
+                /,
+                *args: Any,
+                **kwargs: Any,
+            ) -> Any:
+                async for item in decorated(*args, **kwargs):
+                    yield item
+
+            method = async_generator_method
+        elif inspect.iscoroutinefunction(decorated):
+
+            async def coroutine_method(
+                instance: Any,
+                /,
+                *args: Any,
+                **kwargs: Any,
+            ) -> Any:
+                return await decorated(*args, **kwargs)
+
+            method = coroutine_method
+        else:
+
+            def function_method(
+                instance: Any,
+                /,
+                *args: Any,
+                **kwargs: Any,
+            ) -> Any:
+                return decorated(*args, **kwargs)
+
+            method = function_method
+
+        method.__utility_cache__ = decorated.__utility_cache__
+        functools.update_wrapper(method, wrapped, updated=())
+
+        return method
+
+
+def cache_method(
+    wrapped: Callable[..., Any] = MISSING,
+    /,
+    **options: Any,
+) -> Any:
+    """
+    |decorator_dynamic|
+
+    Caches the results of a generator, async generator or coroutine
+    method in a separate cache per instance, so that the instance is
+    not part of the key and its cache is freed along with it.
+
+    The cache is created on first access to the method on an instance
+    and stored in the instance's ``__dict__``, or, for instances
+    without one, in a :class:`weakref.WeakKeyDictionary`. Instances must
+    support weak references.
+
+
+    Parameters
+    ----------
+    **options: Any
+        The options of :func:`cache_generator`, or of
+        :func:`cache_async_generator` or :func:`cache_coroutine` for an
+        async generator or coroutine method, applied to each instance's
+        cache. ``max_size`` defaults to ``128``.
+    """
+
+    options.setdefault("max_size", 128)
+
+    def decorator(
+        wrapped: Callable[..., Any],
+        /,
+    ) -> Any:
+        if inspect.iscoroutinefunction(wrapped):
+            factory = cache_coroutine(**options)
+        elif inspect.isasyncgenfunction(wrapped):
+            factory = cache_async_generator(**options)
+        elif inspect.isgeneratorfunction(wrapped):
+            factory = cache_generator(**options)
+        else:
+            raise TypeError("cache_method requires a generator function, an async generator function or a coroutine function")
+
+        return _CachedMethod(wrapped, factory)
+
+    if wrapped is MISSING:
+        return decorator
+
+    return decorator(wrapped)
+
+
+def _discard_failed(
+    cache: Cache[Any, asyncio.Future[Any]],
+    key: Any,
+    future: asyncio.Future[Any],
+    /,
+) -> None:
+    if future.cancelled() or future.exception() is not None:
+        if cache.peek(key) is future:
+            del cache[key]
+
+
+_caches: weakref.WeakKeyDictionary[Cache[Any, Any], str] = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def _register_cache(
+    cache: Cache[Any, Any],
+    /,
+) -> None:
+    with _caches_lock:
+        if cache not in _caches:
+            _caches[cache] = f"{type(cache).__name__}@{id(cache):x}"
+
+
+def _unregister_cache(
+    cache: Cache[Any, Any],
+    /,
+) -> None:
+    with _caches_lock:
+        _caches.pop(cache, None)
+
+
+def register_cache(
+    cache: Cache[Any, Any],
+    name: str,
+    /,
+) -> None:
+    """
+    Registers a cache under a name for :func:`get_cache_statistics`.
+
+    Every cache is registered on creation under a generated name, so
+    this is only needed to name it. The registry holds caches weakly.
+
+
+    Parameters
+    ----------
+    cache: :class:`Cache`
+        The cache.
+    name: :class:`str`
+        The name.
+    """
+
+    with _caches_lock:
+        _caches[cache] = name
+
+
+def get_cache_statistics() -> list[dict[str, Any]]:
+    """
+    Gets a snapshot of the statistics of every live cache.
+
+
+    Returns
+    -------
+    list[dict[:class:`str`, Any]]
+        A dictionary for each cache with the keys ``"name"``,
+        ``"type"``, ``"hits"``, ``"misses"``, ``"evictions"``,
+        ``"expirations"``, ``"size"``, and ``"max_size"``, where
+        ``"max_size"`` is ``None`` for unbounded caches.
+    """
+
+    with _caches_lock:
+        caches = list(_caches.items())
+
+    statistics = list()
+
+    for cache, name in caches:
+        statistics.append(
+            {
+                "name": name,
+                "type": type(cache).__name__,
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "evictions": getattr(cache, "evictions", 0),
+                "expirations": getattr(cache, "expirations", 0),
+                "size": len(cache),
+                "max_size": getattr(cache, "max_size", None),
+            }
+        )
+
+    return statistics
+
+
+_prometheus_metrics = (
+    ("hits", "counter", "Cache hits."),
+    ("misses", "counter", "Cache misses."),
+    ("evictions", "counter", "Entries evicted to respect max_size or max_weight."),
+    ("expirations", "counter", "Entries removed because their lifetime ended."),
+    ("size", "gauge", "Entries in the cache."),
+    ("max_size", "gauge", "Maximum entries in the cache."),
+)
+
+
+def format_cache_statistics(
+    statistics: list[dict[str, Any]] = MISSING,
+    /,
+    *,
+    format: Literal["json", "prometheus"],
+) -> str:
+    """
+    Formats cache statistics as JSON or in the Prometheus text
+    exposition format.
+
+
+    Parameters
+    ----------
+    statistics: list[dict[:class:`str`, Any]]
+        The statistics to format. Defaults to
+        :func:`get_cache_statistics`.
+    format: Literal["json", "prometheus"]
+        The format.
+
+
+    Returns
+    -------
+    :class:`str`
+        The formatted statistics.
+    """
+
+    statistics = statistics if statistics is not MISSING else get_cache_statistics()
+
+    if format == "json":
+        return json.dumps(statistics)
+
+    if format != "prometheus":
+        raise ValueError("format must be 'json' or 'prometheus'")
+
+    lines = list()
+
+    for metric, kind, help in _prometheus_metrics:
+        name = f"utility_cache_{metric}_total" if kind == "counter" else f"utility_cache_{metric}"
+
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {kind}")
+
+        for cache in statistics:
+            value = cache[metric]
+
+            if value is None:
+                continue
+
+            label = cache["name"].replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            lines.append(f'{name}{{name="{label}",type="{cache["type"]}"}} {value}')
+
+    return "\n".join(lines) + "\n"
+
+
+_K = TypeVar("_K")
+_V = TypeVar("_V")
+
+
+class Cache(Generic[_K, _V]):
+    """
+    TODO
+    """
+
+    __slots__ = ("__weakref__", "_cache", "hits", "misses")
+
+    hits: int
+    misses: int
+
+    def __init__(
+        self: Self,
+        /,
+    ) -> None:
+        self._cache: dict[_K, _V] = dict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        _register_cache(self)
+
+    def __contains__(
+        self: Self,
+        key: _K,
+    ) -> bool:
+        return key in self._cache
+
+    def __delitem__(
+        self: Self,
+        key: _K,
+        /,
+    ) -> None:
+        try:
+            del self._cache[key]
+        except KeyError:
+            raise
+
+    def __getitem__(
+        self: Self,
+        key: _K,
+        /,
+    ) -> _V:
+        try:
+            value = self._cache[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        else:
+            self.hits += 1
+            return value
+
+    def __setitem__(
+        self: Self,
+        key: _K,
+        value: _V,
+        /,
+    ) -> None:
+        self._cache[key] = value
+
+    def __len__(
+        self: Self,
+        /,
+    ) -> int:
+        return len(self._cache)
+
+    @property
+    def size(
+        self: Self,
+        /,
+    ) -> int:
+        return len(self)
+
+    def clear(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Clears the cache.
+        """
+
+        self._cache.clear()
+
+    def reset(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Resets the cache.
+        """
+
+        self.clear()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self: Self,
+        key: _K,
+        default: Any = None,
+        /,
+    ) -> Any:
+        """
+        Gets a value from the cache, counting a hit or a miss.
+
+
+        Parameters
+        ----------
+        key: Any
+            The key.
+        default: Any
+            The value to return if the key is not in the cache.
+            Defaults to ``None``.
+
+
+        Returns
+        -------
+        Any
+            The value, or ``default``.
+        """
+
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def peek(
+        self: Self,
+        key: _K,
+        default: Any = None,
+        /,
+    ) -> Any:
+        """
+        Gets a value from the cache without counting a hit or a miss
+        or otherwise affecting eviction.
+
+
+        Parameters
+        ----------
+        key: Any
+            The key.
+        default: Any
+            The value to return if the key is not in the cache.
+            Defaults to ``None``.
+
+
+        Returns
+        -------
+        Any
+            The value, or ``default``.
+        """
+
+        return self._cache.get(key, default)
+
+    def pop(
+        self: Self,
+        key: _K,
+        default: Any = MISSING,
+        /,
+    ) -> Any:
+        """
+        Removes a value from the cache and returns it.
+
+
+        Parameters
+        ----------
+        key: Any
+            The key.
+        default: Any
+            The value to return if the key is not in the cache.
+
+
+        Raises
+        ------
+        KeyError
+            The key is not in the cache and no default was given.
+
+
+        Returns
+        -------
+        Any
+            The value, or ``default``.
+        """
+
+        value = self.peek(key, MISSING)
+
+        if value is MISSING:
+            if default is MISSING:
+                raise KeyError(key)
+
+            return default
+
+        del self[key]
+
+        return value
+
+    def get_or_set(
+        self: Self,
+        key: _K,
+        factory: Callable[[], _V],
+        /,
+    ) -> _V:
+        """
+        Gets a value from the cache, or creates and sets it if the key
+        is not in the cache.
+
+
+        Parameters
+        ----------
+        key: Any
+            The key.
+        factory: Callable[[], Any]
+            A callable which creates the value.
+
+
+        Returns
+        -------
+        Any
+            The value.
+        """
+
+        value = self.get(key, MISSING)
+
+        if value is MISSING:
+            value = factory()
+            self[key] = value
+
+        return value
+
+    def get_many(
+        self: Self,
+        keys: Iterable[_K],
+        /,
+    ) -> dict[_K, _V]:
+        """
+        Gets many values from the cache, counting a hit or a miss for
+        each key.
+
+
+        Parameters
+        ----------
+        keys: Iterable[Any]
+            The keys.
+
+
+        Returns
+        -------
+        dict[Any, Any]
+            The keys which are in the cache and their values.
+        """
+
+        values = dict()
+
+        for key in keys:
+            value = self.get(key, MISSING)
+
+            if value is not MISSING:
+                values[key] = value
+
+        return values
+
+    def set_many(
+        self: Self,
+        items: Mapping[_K, _V] | Iterable[tuple[_K, _V]],
+        /,
+    ) -> None:
+        """
+        Sets many values in the cache.
+
+
+        Parameters
+        ----------
+        items: Mapping[Any, Any] | Iterable[tuple[Any, Any]]
+            The keys and values.
+        """
+
+        pairs: Iterable[tuple[_K, _V]] = items.items() if isinstance(items, collections.abc.Mapping) else items  # type: ignore  # narrowing to Mapping loses the key and value types
+
+        for key, value in pairs:
+            self[key] = value
+
+    def delete_many(
+        self: Self,
+        keys: Iterable[_K],
+        /,
+    ) -> int:
+        """
+        Removes many values from the cache, ignoring keys which are not
+        in the cache.
+
+
+        Parameters
+        ----------
+        keys: Iterable[Any]
+            The keys.
+
+
+        Returns
+        -------
+        :class:`int`
+            The number of values removed.
+        """
+
+        count = 0
+
+        for key in keys:
+            if self.peek(key, MISSING) is not MISSING:
+                del self[key]
+                count += 1
+
+        return count
+
+    def _snapshot_entries(
+        self: Self,
+        /,
+    ) -> Iterator[tuple[_K, _V, Any]]:
+        for key, value in self._cache.items():
+            yield key, value, None
+
+    def _restore_entry(
+        self: Self,
+        key: _K,
+        value: _V,
+        extra: Any,
+        /,
+    ) -> None:
+        self[key] = value
+
+    def _container_size(
+        self: Self,
+        /,
+    ) -> int:
+        return sys.getsizeof(self) + sys.getsizeof(self._cache)
+
+    def memory_usage(
+        self: Self,
+        /,
+        *,
+        sample: int | None = MISSING,
+        largest: int = MISSING,
+    ) -> dict[str, Any]:
+        """
+        Estimates the memory held by the cache.
+
+        Keys and values are measured with an approximate deep
+        :func:`sys.getsizeof`, on an evenly spaced sample of entries
+        which is then scaled up to the whole cache, so that this is
+        cheap to call on large caches. Objects shared between entries
+        are counted once per entry. The cache must not be modified
+        while it is measured.
+
+
+        Parameters
+        ----------
+        sample: :class:`int` | None
+            The number of entries to measure, or ``None`` to measure
+            every entry. Defaults to ``1024``.
+        largest: :class:`int`
+            The number of largest measured entries to report.
+            Defaults to ``0``.
+
+
+        Returns
+        -------
+        dict[:class:`str`, Any]
+            A dictionary with the keys ``"entries"``, ``"sampled"``,
+            ``"container"``, ``"keys"``, ``"values"``, and ``"total"``,
+            in bytes where applicable, ``"weight"`` for caches with a
+            ``max_weight``, and ``"largest"``, a list of dictionaries
+            with the keys ``"key"`` and ``"size"``, if requested.
+        """
+
+        sample = sample if sample is not MISSING else 1024
+        largest = largest if largest is not MISSING else 0
+
+        if sample is not None and sample < 1:
+            raise ValueError("sample must be None or a positive integer")
+
+        count = len(self)
+        step = max(1, count // sample) if sample is not None else 1
+
+        sampled = 0
+        keys = 0
+        values = 0
+        top: list[tuple[int, int, Any]] = list()
+
+        for key, value, _ in itertools.islice(self._snapshot_entries(), 0, sample and sample * step, step):
+            key_size = _estimate_size(key)
+            value_size = _estimate_size(value)
+
+            keys += key_size
+            values += value_size
+            sampled += 1
+
+            if largest:
+                item = (key_size + value_size, sampled, key)
+
+                if len(top) < largest:
+                    heapq.heappush(top, item)
+                else:
+                    heapq.heappushpop(top, item)
+
+        scale = count / sampled if sampled else 0
+        container = self._container_size()
+
+        report: dict[str, Any] = {
+            "entries": count,
+            "sampled": sampled,
+            "container": container,
+            "keys": round(keys * scale),
+            "values": round(values * scale),
+            "total": container + round((keys + values) * scale),
+        }
+
+        if getattr(self, "max_weight", None) is not None:
+            report["weight"] = self.weight  # type: ignore  # caches with a max_weight are SizedCache
+
+        if largest:
+            report["largest"] = [{"key": key, "size": size} for size, _, key in sorted(top, reverse=True)]
+
+        return report
+
+    def snapshot(
+        self: Self,
+        file: str | os.PathLike[str] | BinaryIO,
+        /,
+    ) -> int:
+        """
+        Writes the entries, their order, and the statistics of the cache
+        to a file, one entry at a time.
+
+        Entries which cannot be pickled are skipped. The cache must not
+        be modified while the snapshot is written.
+
+
+        Parameters
+        ----------
+        file: :class:`str` | :class:`os.PathLike` | :class:`typing.BinaryIO`
+            A path or a binary file opened for writing.
+
+
+        Returns
+        -------
+        :class:`int`
+            The number of entries written.
+        """
+
+        if not hasattr(file, "write"):
+            with open(file, "wb") as stream:  # type: ignore  # file is a path here
+                return self.snapshot(stream)
+
+        stream: BinaryIO = file  # type: ignore  # file is a stream here
+
+        statistics = {name: getattr(self, name) for name in ("hits", "misses", "evictions", "expirations") if hasattr(self, name)}
+
+        stream.write(_snapshot_magic)
+        stream.write(_snapshot_header.pack(_snapshot_version))
+        _write_record(stream, pickle.dumps(statistics, protocol=pickle.HIGHEST_PROTOCOL))
+
+        count = 0
+        for entry in self._snapshot_entries():
+            try:
+                data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                continue
+
+            _write_record(stream, data)
+            count += 1
+
+        stream.write(_snapshot_length.pack(0))
+
+        return count
+
+    def restore(
+        self: Self,
+        file: str | os.PathLike[str] | BinaryIO,
+        /,
+    ) -> int:
+        """
+        Reads entries and statistics written by :meth:`snapshot` into
+        the cache, one entry at a time, in their original order.
+
+        Existing entries are kept, and restored entries are subject to
+        the cache's own limits.
+
+
+        Parameters
+        ----------
+        file: :class:`str` | :class:`os.PathLike` | :class:`typing.BinaryIO`
+            A path or a binary file opened for reading.
+
+
+        Returns
+        -------
+        :class:`int`
+            The number of entries read.
+        """
+
+        if not hasattr(file, "read"):
+            with open(file, "rb") as stream:  # type: ignore  # file is a path here
+                return self.restore(stream)
+
+        stream: BinaryIO = file  # type: ignore  # file is a stream here
+
+        if stream.read(len(_snapshot_magic)) != _snapshot_magic:
+            raise ValueError("file is not a cache snapshot")
+
+        (version,) = _snapshot_header.unpack(stream.read(_snapshot_header.size))
+
+        if version != _snapshot_version:
+            raise ValueError(f"cache snapshot version {version} is not supported")
+
+        statistics = pickle.loads(_read_record(stream))
+
+        count = 0
+        while data := _read_record(stream):
+            key, value, extra = pickle.loads(data)
+            self._restore_entry(key, value, extra)
+            count += 1
+
+        for name, value in statistics.items():
+            try:
+                setattr(self, name, value)
+            except AttributeError:
+                pass  # NOTE: e.g. statistics which are summed from shards
+
+        return count
+
+
+_snapshot_magic = b"UTILITY-CACHE\x00"
+_snapshot_version = 1
+_snapshot_header = struct.Struct("<H")
+_snapshot_length = struct.Struct("<Q")
+
+
+def _write_record(
+    stream: BinaryIO,
+    data: bytes,
+    /,
+) -> None:
+    stream.write(_snapshot_length.pack(len(data)))
+    stream.write(data)
+
+
+def _read_record(
+    stream: BinaryIO,
+    /,
+) -> bytes:
+    header = stream.read(_snapshot_length.size)
+
+    if len(header) != _snapshot_length.size:
+        raise ValueError("cache snapshot is truncated")
+
+    (length,) = _snapshot_length.unpack(header)
+    data = stream.read(length)
+
+    if len(data) != length:
+        raise ValueError("cache snapshot is truncated")
+
+    return data
+
+
+class SizedCache(Cache[_K, _V]):
+    """
+    The base class of bounded caches. It neither evicts entries nor
+    enforces ``max_size`` or ``max_weight`` itself, so ``max_weight``
+    is only accepted by the subclasses which enforce it, such as
+    :class:`LRUCache` and :class:`LFUCache`.
+    """
+
+    __slots__ = ("_max_size", "_max_weight", "_weigher", "_weights", "_weight", "evictions")
+
+    evictions: int
+
+    def __init__(
+        self: Self,
+        /,
+        *,
+        max_size: int,
+        max_weight: int | None = MISSING,
+        weigher: Callable[[_V], int] = MISSING,
+    ) -> None:
+        super().__init__()
+
+        self._max_size: int = MISSING
+
+        self.max_size = max_size
+
+        max_weight = max_weight if max_weight is not MISSING else None
+
+        if max_weight is not None and max_weight < 0:
+            raise ValueError("max_weight must be None, 0, or a positive integer")
+
+        # NOTE: weighing needs an eviction order, which only the
+        #       subclasses define by implementing _evict
+        if max_weight is not None and type(self)._evict is SizedCache._evict:
+            raise TypeError(f"{type(self).__name__} does not support max_weight")
+
+        # NOTE: an unweighted cache uses sys.maxsize as its max weight so
+        #       that eviction checks need no separate None check
+        self._max_weight: int = max_weight if max_weight is not None else sys.maxsize
+        self._weigher: Callable[[_V], int] = weigher if weigher is not MISSING else _estimate_size
+        self._weights: dict[_K, int] | None = dict() if max_weight is not None else None
+        self._weight: int = 0
+
+        self.evictions: int = 0
+
+    def __delitem__(
+        self: Self,
+        key: _K,
+        /,
+    ) -> None:
+        super().__delitem__(key)
+
+        if self._weights is not None:
+            self._weight -= self._weights.pop(key, 0)
+
+    @property
+    def max_size(
+        self: Self,
+        /,
+    ) -> int:
+        return self._max_size
+
+    @max_size.setter
+    def max_size(
+        self: Self,
+        value: int,
+        /,
+    ) -> None:
+        if value < 0:
+            raise ValueError("max_size must be 0 or a positive integer")
+
+        self._max_size = value
+
+    @property
+    def max_weight(
+        self: Self,
+        /,
+    ) -> int | None:
+        return self._max_weight if self._weights is not None else None
+
+    def _container_size(
+        self: Self,
+        /,
+    ) -> int:
+        return super()._container_size() + (sys.getsizeof(self._weights) if self._weights is not None else 0)
+
+    @property
+    def weight(
+        self: Self,
+        /,
+    ) -> int:
+        return self._weight
+
+    def _weigh(
+        self: Self,
+        key: _K,
+        value: _V,
+        /,
+    ) -> None:
+        weights: dict[_K, int] = self._weights  # type: ignore  # only called when weighted
+        weight = self._weigher(value)
+
+        self._weight += weight - weights.get(key, 0)
+        weights[key] = weight
+
+    def _unweigh(
+        self: Self,
+        key: _K,
+        /,
+    ) -> None:
+        if self._weights is not None:
+            self._weight -= self._weights.pop(key, 0)
+
+    def _evict(
+        self: Self,
+        /,
+    ) -> None:
+        raise NotImplementedError
+
+    def add_weight(
+        self: Self,
+        key: _K,
+        weight: int,
+        /,
+    ) -> None:
+        """
+        Adds to the weight of an entry whose value has grown in place,
+        evicting entries until the cache is within its max weight.
+
+        Does nothing if the cache is unweighted or the key is not in
+        the cache.
+
+
+        Parameters
+        ----------
+        key: Any
+            The key.
+        weight: :class:`int`
+            The weight to add.
+        """
+
+        weights = self._weights
+
+        if weights is None or key not in weights:
+            return
+
+        weights[key] += weight
+        self._weight += weight
+
+        while self._weight > self._max_weight and self._cache:
+            self._evict()
+
+    def clear(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Clears the cache.
+        """
+
+        super().clear()
+
+        if self._weights is not None:
+            self._weights.clear()
+
+        self._weight = 0
+
+    def reset(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Resets the cache.
+        """
+
+        super().reset()
+
+        self.evictions = 0
+
+
+class LRUCache(SizedCache[_K, _V]):
+    """
+    TODO
+    """
+
+    __slots__ = ()
+
+    hits: int
+    misses: int
+    evictions: int
+
+    def __init__(
+        self: Self,
+        /,
+        *,
+        max_size: int,
+        max_weight: int | None = MISSING,
+        weigher: Callable[[_V], int] = MISSING,
+    ) -> None:
+        super().__init__(max_size=max_size, max_weight=max_weight, weigher=weigher)
+
+        self._cache: OrderedDict[_K, _V] = collections.OrderedDict()
+
+    def __getitem__(self, key: _K) -> _V:
+        try:
+            value = super().__getitem__(key)
+        except KeyError:
+            raise
+        else:
+            self._cache.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: _K, value: _V) -> None:
+        if key in self._cache.keys():
+            self._cache.move_to_end(key)
+
+        super().__setitem__(key, value)
+
+        if self._weights is not None:
+            self._weigh(key, value)
+
+        while len(self._cache) > self._max_size or self._weight > self._max_weight:
+            self._evict()
+
+    def _evict(
+        self: Self,
+        /,
+    ) -> None:
+        key, _ = self._cache.popitem(last=False)
+        self._unweigh(key)
+
+        self.evictions += 1
+
+    def get(
+        self: Self,
+        key: _K,
+        default: Any = None,
+        /,
+    ) -> Any:
+        """
+        Gets a value from the cache, counting a hit or a miss.
+
+
+        Parameters
+        ----------
+        key: Any
+            The key.
+        default: Any
+            The value to return if the key is not in the cache.
+            Defaults to ``None``.
+
+
+        Returns
+        -------
+        Any
+            The value, or ``default``.
+        """
+
+        cache = self._cache
+        value = cache.get(key, MISSING)
+
+        if value is MISSING:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        cache.move_to_end(key)
+
+        return value
+
+    def set_many(
+        self: Self,
+        items: Mapping[_K, _V] | Iterable[tuple[_K, _V]],
+        /,
+    ) -> None:
+        """
+        Sets many values in the cache, evicting once for the whole
+        batch.
+
+
+        Parameters
+        ----------
+        items: Mapping[Any, Any] | Iterable[tuple[Any, Any]]
+            The keys and values.
+        """
+
+        pairs: Iterable[tuple[_K, _V]] = items.items() if isinstance(items, collections.abc.Mapping) else items  # type: ignore  # narrowing to Mapping loses the key and value types
+
+        cache = self._cache
+        weighted = self._weights is not None
+
+        for key, value in pairs:
+            if key in cache:
+                cache.move_to_end(key)
+
+            cache[key] = value
+
+            if weighted:
+                self._weigh(key, value)
+
+        while len(cache) > self._max_size or self._weight > self._max_weight:
+            self._evict()
+
+
+class LFUCache(SizedCache[_K, _V]):
+    """
+    TODO
+    """
+
+    __slots__ = ("_frequencies", "_buckets", "_min_frequency")
+
+    evictions: int
+
+    def __init__(
+        self: Self,
+        /,
+        *,
+        max_size: int,
+        max_weight: int | None = MISSING,
+        weigher: Callable[[_V], int] = MISSING,
+    ) -> None:
+        super().__init__(max_size=max_size, max_weight=max_weight, weigher=weigher)
+
+        # NOTE: each bucket is a dict used as an ordered set, so that
+        #       ties within a frequency are broken by recency in O(1)
+        self._frequencies: dict[_K, int] = dict()
+        self._buckets: dict[int, dict[_K, None]] = dict()
+        self._min_frequency: int = 0
+
+    def _touch(
+        self: Self,
+        key: _K,
+        /,
+    ) -> None:
+        frequency = self._frequencies[key]
+        bucket = self._buckets[frequency]
+        del bucket[key]
+
+        if not bucket:
+            del self._buckets[frequency]
+
+            if self._min_frequency == frequency:
+                self._min_frequency = frequency + 1
+
+        frequency += 1
+        self._frequencies[key] = frequency
+
+        try:
+            self._buckets[frequency][key] = None
+        except KeyError:
+            self._buckets[frequency] = {key: None}
+
+    def _evict(
+        self: Self,
+        /,
+    ) -> None:
+        try:
+            bucket = self._buckets[self._min_frequency]
+        except KeyError:
+            # NOTE: the minimum is stale only after consecutive evictions
+            #       emptied its bucket, it is otherwise reset to 1 by the
+            #       insertion which follows every eviction
+            self._min_frequency = min(self._buckets.keys())
+            bucket = self._buckets[self._min_frequency]
+
+        key = next(iter(bucket))
+        del bucket[key]
+
+        if not bucket:
+            del self._buckets[self._min_frequency]
+
+        del self._frequencies[key]
+        del self._cache[key]
+
+        self._unweigh(key)
+
+        self.evictions += 1
+
+    def __delitem__(
+        self: Self,
+        key: _K,
+        /,
+    ) -> None:
+        super().__delitem__(key)
+
+        frequency = self._frequencies.pop(key)
+        bucket = self._buckets[frequency]
+        del bucket[key]
+
+        if not bucket:
+            del self._buckets[frequency]
+
+    def __getitem__(
+        self: Self,
+        key: _K,
+        /,
+    ) -> _V:
+        try:
+            value = super().__getitem__(key)
+        except KeyError:
+            raise
+        else:
+            self._touch(key)
+            return value
+
+    def __setitem__(
+        self: Self,
+        key: _K,
+        value: _V,
+        /,
+    ) -> None:
+        if key in self._cache:
+            self._cache[key] = value
+            self._touch(key)
+        else:
+            if self.max_size == 0:
+                return
+
+            while len(self._cache) >= self.max_size:
+                self._evict()
+
+            self._cache[key] = value
+            self._frequencies[key] = 1
+
+            try:
+                self._buckets[1][key] = None
+            except KeyError:
+                self._buckets[1] = {key: None}
+
+            self._min_frequency = 1
+
+        if self._weights is not None:
+            self._weigh(key, value)
+
+            while self._weight > self._max_weight:
+                self._evict()
+
+    def _snapshot_entries(
+        self: Self,
+        /,
+    ) -> Iterator[tuple[_K, _V, Any]]:
+        for key, value in self._cache.items():
+            yield key, value, self._frequencies[key]
+
+    def _restore_entry(
+        self: Self,
+        key: _K,
+        value: _V,
+        extra: Any,
+        /,
+    ) -> None:
+        self[key] = value
+
+        if key not in self._frequencies or not extra:
+            return
+
+        frequency = self._frequencies[key]
+        bucket = self._buckets[frequency]
+        del bucket[key]
+
+        if not bucket:
+            del self._buckets[frequency]
+
+        self._frequencies[key] = extra
+
+        try:
+            self._buckets[extra][key] = None
+        except KeyError:
+            self._buckets[extra] = {key: None}
+
+        # NOTE: the bucket for _min_frequency may now be missing, which
+        #       _evict recovers from
+        self._min_frequency = min(self._min_frequency, extra)
+
+    def _container_size(
+        self: Self,
+        /,
+    ) -> int:
+        return super()._container_size() + sys.getsizeof(self._frequencies) + sys.getsizeof(self._buckets) + sum(map(sys.getsizeof, self._buckets.values()))
+
+    def clear(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Clears the cache.
+        """
+
+        super().clear()
+
+        self._frequencies.clear()
+        self._buckets.clear()
+        self._min_frequency = 0
+
+
+_halve_table = bytes(i >> 1 for i in range(256))
+
+
+class _FrequencySketch:
+    # NOTE: a count-min sketch of 4 rows of saturating 4-bit counters
+    #       (stored one per byte), which halves every counter once it
+    #       has seen 10 times as many increments as the cache holds
+    #       entries, so that stale popularity decays
+
+    __slots__ = ("_table", "_width", "_mask", "_additions", "_sample_size")
+
+    def __init__(
+        self: Self,
+        capacity: int,
+        /,
+    ) -> None:
+        width = 16
+        while width < capacity:
+            width <<= 1
+
+        self._table: bytearray = bytearray(4 * width)
+        self._width: int = width
+        self._mask: int = width - 1
+        self._additions: int = 0
+        self._sample_size: int = 10 * max(capacity, 1)
+
+    def frequency(
+        self: Self,
+        key: Any,
+        /,
+    ) -> int:
+        h = (hash(key) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        mask = self._mask
+        width = self._width
+        table = self._table
+
+        return min(
+            table[h & mask],
+            table[width + ((h >> 16) & mask)],
+            table[2 * width + ((h >> 32) & mask)],
+            table[3 * width + ((h >> 48) & mask)],
+        )
+
+    def increment(
+        self: Self,
+        key: Any,
+        /,
+    ) -> None:
+        h = (hash(key) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        mask = self._mask
+        width = self._width
+        table = self._table
+
+        added = False
+        for i in (h & mask, width + ((h >> 16) & mask), 2 * width + ((h >> 32) & mask), 3 * width + ((h >> 48) & mask)):
+            if table[i] < 15:
+                table[i] += 1
+                added = True
+
+        if added:
+            self._additions += 1
+
+            if self._additions >= self._sample_size:
+                self._table = table.translate(_halve_table)
+                self._additions //= 2
+
+    def clear(
+        self: Self,
+        /,
+    ) -> None:
+        self._table = bytearray(len(self._table))
+        self._additions = 0
+
+
+class TinyLFUCache(SizedCache[_K, _V]):
+    """
+    TODO
+    """
+
+    # NOTE: W-TinyLFU. new entries enter a small LRU window, and an
+    #       entry leaving the window is only admitted to the main
+    #       segmented LRU if the frequency sketch estimates it to be more
+    #       popular than the main segment's eviction victim. one-off keys
+    #       such as those of a scan therefore never displace the hot set
+
+    __slots__ = ("_sketch", "_window", "_probation", "_protected")
+
+    hits: int
+    misses: int
+    evictions: int
+
+    def __init__(
+        self: Self,
+        /,
+        *,
+        max_size: int,
+    ) -> None:
+        super().__init__(max_size=max_size)
+
+        self._sketch: _FrequencySketch = _FrequencySketch(max_size)
+        self._window: OrderedDict[_K, None] = collections.OrderedDict()
+        self._probation: OrderedDict[_K, None] = collections.OrderedDict()
+        self._protected: OrderedDict[_K, None] = collections.OrderedDict()
+
+    def __delitem__(
+        self: Self,
+        key: _K,
+        /,
+    ) -> None:
+        super().__delitem__(key)
+
+        if key in self._window:
+            del self._window[key]
+        elif key in self._probation:
+            del self._probation[key]
+        else:
+            del self._protected[key]
+
+    def __getitem__(
+        self: Self,
+        key: _K,
+        /,
+    ) -> _V:
+        self._sketch.increment(key)
+
+        try:
+            value = self._cache[key]
+        except KeyError:
+            self.misses += 1
+            raise
+
+        self.hits += 1
+
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._probation:
+            del self._probation[key]
+            self._protected[key] = None
+
+            max_protected = (self._max_size - self._max_window) * 4 // 5
+            while len(self._protected) > max_protected:
+                demoted, _ = self._protected.popitem(last=False)
+                self._probation[demoted] = None
+        else:
+            self._protected.move_to_end(key)
+
+        return value
+
+    def __setitem__(
+        self: Self,
+        key: _K,
+        value: _V,
+        /,
+    ) -> None:
+        if key in self._cache:
+            self._cache[key] = value
+            return
+
+        self._sketch.increment(key)
+
+        self._cache[key] = value
+        self._window[key] = None
+
+        max_window = self._max_window
+        while len(self._window) > max_window:
+            candidate, _ = self._window.popitem(last=False)
+            self._admit(candidate)
+
+        while len(self._cache) > self._max_size:
+            self._evict()
+
+    @property
+    def _max_window(
+        self: Self,
+        /,
+    ) -> int:
+        return max(1, self._max_size // 100)
+
+    def _admit(
+        self: Self,
+        candidate: _K,
+        /,
+    ) -> None:
+        max_main = self._max_size - self._max_window
+
+        if len(self._probation) + len(self._protected) < max_main:
+            self._probation[candidate] = None
+            return
+
+        if self._probation:
+            main = self._probation
+        elif self._protected:
+            main = self._protected
+        else:
+            del self._cache[candidate]
+            self.evictions += 1
+            return
+
+        victim = next(iter(main))
+
+        if self._sketch.frequency(candidate) > self._sketch.frequency(victim):
+            del main[victim]
+            del self._cache[victim]
+            self._probation[candidate] = None
+        else:
+            del self._cache[candidate]
+
+        self.evictions += 1
+
+    def _evict(
+        self: Self,
+        /,
+    ) -> None:
+        for segment in (self._probation, self._window, self._protected):
+            if segment:
+                key, _ = segment.popitem(last=False)
+                del self._cache[key]
+                self.evictions += 1
+                return
+
+    def _container_size(
+        self: Self,
+        /,
+    ) -> int:
+        return super()._container_size() + sys.getsizeof(self._sketch._table) + sum(map(sys.getsizeof, (self._window, self._probation, self._protected)))
+
+    def clear(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Clears the cache.
+        """
+
+        super().clear()
+
+        self._sketch.clear()
+        self._window.clear()
+        self._probation.clear()
+        self._protected.clear()
+
+
+class TTLCache(LRUCache[_K, _V]):
+    """
+    TODO
+    """
+
+    __slots__ = ("_ttl", "_timer", "_expiries", "_heap", "_counter", "expirations")
+
+    misses: int
+    evictions: int
+    expirations: int
+
+    def __init__(
+        self: Self,
+        /,
+        *,
+        max_size: int,
+        ttl: float | None,
+        timer: Callable[[], float] = MISSING,
+        max_weight: int | None = MISSING,
+        weigher: Callable[[_V], int] = MISSING,
+    ) -> None:
+        super().__init__(max_size=max_size, max_weight=max_weight, weigher=weigher)
+
+        self._ttl: float | None = ttl
+        self._timer: Callable[[], float] = timer if timer is not MISSING else time.monotonic
+
+        # NOTE: the heap may hold stale (expiry, n, key) entries for keys
+        #       which were since overwritten or removed, these are skipped
+        #       by comparing against _expiries when they reach the top
+        self._expiries: dict[_K, float] = dict()
+        self._heap: list[tuple[float, int, _K]] = list()
+        self._counter: Iterator[int] = itertools.count()
+
+        self.expirations: int = 0
+
+    @property
+    def ttl(
+        self: Self,
+        /,
+    ) -> float | None:
+        return self._ttl
+
+    def __contains__(
+        self: Self,
+        key: _K,
+    ) -> bool:
+        try:
+            expiry = self._expiries[key]
+        except KeyError:
+            return key in self._cache
+
+        if expiry <= self._timer():
+            self._expire(key)
+            return False
+
+        return True
+
+    def __delitem__(
+        self: Self,
+        key: _K,
+        /,
+    ) -> None:
+        super().__delitem__(key)
+
+        self._expiries.pop(key, None)
+
+    def __getitem__(
+        self: Self,
+        key: _K,
+        /,
+    ) -> _V:
+        try:
+            expiry = self._expiries[key]
+        except KeyError:
+            pass
+        else:
+            if expiry <= self._timer():
+                self._expire(key)
+                self.misses += 1
+                raise KeyError(key)
+
+        return super().__getitem__(key)
+
+    def __setitem__(
+        self: Self,
+        key: _K,
+        value: _V,
+        /,
+    ) -> None:
+        self.set(key, value)
+
+    def _evict(
+        self: Self,
+        /,
+    ) -> None:
+        key, _ = self._cache.popitem(last=False)
+        self._expiries.pop(key, None)
+        self._unweigh(key)
+
+        self.evictions += 1
+
+    def _expire(
+        self: Self,
+        key: _K,
+        /,
+    ) -> None:
+        del self._cache[key]
+        del self._expiries[key]
+        self._unweigh(key)
+
+        self.expirations += 1
+
+    def set(
+        self: Self,
+        key: _K,
+        value: _V,
+        /,
+        *,
+        ttl: float | None = MISSING,
+    ) -> None:
+        """
+        Sets a value in the cache with an optional per-entry lifetime.
+
+
+        Parameters
+        ----------
+        key: Any
+            The key.
+        value: Any
+            The value.
+        ttl: :class:`float` | None
+            The lifetime of this entry in seconds, or ``None`` for an
+            entry that never expires. Defaults to :attr:`.ttl`.
+        """
+
+        ttl = ttl if ttl is not MISSING else self._ttl
+
+        now = self._timer()
+
+        if self._heap and self._heap[0][0] <= now:
+            self.expire(now=now)
+
+        super().__setitem__(key, value)
+
+        if key not in self._cache:
+            return
+
+        if ttl is None:
+            self._expiries.pop(key, None)
+        else:
+            expiry = now + ttl
+            self._expiries[key] = expiry
+            heapq.heappush(self._heap, (expiry, next(self._counter), key))
+
+            if len(self._heap) > 2 * len(self._expiries) + 64:
+                self._compact()
+
+    # NOTE: the fast paths of LRUCache bypass expiry, so those of Cache
+    #       are used instead
+
+    def get(
+        self: Self,
+        key: _K,
+        default: Any = None,
+        /,
+    ) -> Any:
+        return Cache.get(self, key, default)
+
+    def set_many(
+        self: Self,
+        items: Mapping[_K, _V] | Iterable[tuple[_K, _V]],
+        /,
+    ) -> None:
+        Cache.set_many(self, items)
+
+    def peek(
+        self: Self,
+        key: _K,
+        default: Any = None,
+        /,
+    ) -> Any:
+        """
+        Gets a value from the cache without counting a hit or a miss
+        or otherwise affecting eviction.
+
+
+        Parameters
+        ----------
+        key: Any
+            The key.
+        default: Any
+            The value to return if the key is not in the cache.
+            Defaults to ``None``.
+
+
+        Returns
+        -------
+        Any
+            The value, or ``default``.
+        """
+
+        if key not in self:
+            return default
+
+        return self._cache[key]
+
+    def _snapshot_entries(
+        self: Self,
+        /,
+    ) -> Iterator[tuple[_K, _V, Any]]:
+        now = self._timer()
+
+        for key, value in self._cache.items():
+            expiry = self._expiries.get(key)
+
+            if expiry is None:
+                yield key, value, None
+            elif expiry > now:
+                yield key, value, expiry - now
+
+    def _restore_entry(
+        self: Self,
+        key: _K,
+        value: _V,
+        extra: Any,
+        /,
+    ) -> None:
+        self.set(key, value, ttl=extra)
+
+    def _container_size(
+        self: Self,
+        /,
+    ) -> int:
+        return super()._container_size() + sys.getsizeof(self._expiries) + sys.getsizeof(self._heap) + len(self._heap) * sys.getsizeof((0.0, 0, None))
+
+    def _compact(
+        self: Self,
+        /,
+    ) -> None:
+        expiries = self._expiries
+        self._heap = [entry for entry in self._heap if expiries.get(entry[2]) == entry[0]]
+        heapq.heapify(self._heap)
+
+    def expire(
+        self: Self,
+        /,
+        *,
+        now: float = MISSING,
+    ) -> int:
+        """
+        Removes all expired entries from the cache.
+
+
+        Returns
+        -------
+        :class:`int`
+            The number of entries removed.
+        """
+
+        now = now if now is not MISSING else self._timer()
+
+        heap = self._heap
+        expiries = self._expiries
+
+        count = 0
+        while heap and heap[0][0] <= now:
+            expiry, _, key = heapq.heappop(heap)
+
+            if expiries.get(key) == expiry:
+                self._expire(key)
+                count += 1
+
+        return count
+
+    def clear(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Clears the cache.
+        """
+
+        super().clear()
+
+        self._expiries.clear()
+        self._heap.clear()
+
+    def reset(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Resets the cache.
+        """
+
+        super().reset()
+
+        self.expirations = 0
+
+
+class ConcurrentCache(Cache[_K, _V]):
+    """
+    TODO
+    """
+
+    __slots__ = ("_shards", "_locks")
+
+    def __init__(
+        self: Self,
+        /,
+        *,
+        shards: int = MISSING,
+    ) -> None:
+        shards = shards if shards is not MISSING else 16
+
+        if shards < 1:
+            raise ValueError("shards must be a positive integer")
+
+        # NOTE: Cache.__init__ is deliberately not called, all storage
+        #       and statistics live in the shards
+        self._shards: tuple[Cache[_K, _V], ...] = tuple(self._make_shard(i, shards) for i in range(shards))
+        self._locks: tuple[threading.Lock, ...] = tuple(threading.Lock() for _ in range(shards))
+
+        for shard in self._shards:
+            _unregister_cache(shard)
+
+        _register_cache(self)
+
+    def _make_shard(
+        self: Self,
+        index: int,
+        count: int,
+        /,
+    ) -> Cache[_K, _V]:
+        return Cache()
+
+    def __contains__(
+        self: Self,
+        key: _K,
+    ) -> bool:
+        i = hash(key) % len(self._shards)
+
+        with self._locks[i]:
+            return key in self._shards[i]
+
+    def __delitem__(
+        self: Self,
+        key: _K,
+        /,
+    ) -> None:
+        i = hash(key) % len(self._shards)
+
+        with self._locks[i]:
+            del self._shards[i][key]
+
+    def __getitem__(
+        self: Self,
+        key: _K,
+        /,
+    ) -> _V:
+        i = hash(key) % len(self._shards)
+
+        with self._locks[i]:
+            return self._shards[i][key]
+
+    def __setitem__(
+        self: Self,
+        key: _K,
+        value: _V,
+        /,
+    ) -> None:
+        i = hash(key) % len(self._shards)
+
+        with self._locks[i]:
+            self._shards[i][key] = value
+
+    def __len__(
+        self: Self,
+        /,
+    ) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    @property
+    def hits(
+        self: Self,
+        /,
+    ) -> int:
+        return sum(shard.hits for shard in self._shards)
+
+    @property
+    def misses(
+        self: Self,
+        /,
+    ) -> int:
+        return sum(shard.misses for shard in self._shards)
+
+    @property
+    def evictions(
+        self: Self,
+        /,
+    ) -> int:
+        return sum(getattr(shard, "evictions", 0) for shard in self._shards)
+
+    def get(
+        self: Self,
+        key: _K,
+        default: Any = None,
+        /,
+    ) -> Any:
+        """
+        Gets a value from the cache, counting a hit or a miss.
+
+
+        Parameters
+        ----------
+        key: Any
+            The key.
+        default: Any
+            The value to return if the key is not in the cache.
+            Defaults to ``None``.
+
+
+        Returns
+        -------
+        Any
+            The value, or ``default``.
+        """
+
+        i = hash(key) % len(self._shards)
+
+        with self._locks[i]:
+            return self._shards[i].get(key, default)
+
+    def peek(
+        self: Self,
+        key: _K,
+        default: Any = None,
+        /,
+    ) -> Any:
+        """
+        Gets a value from the cache without counting a hit or a miss
+        or otherwise affecting eviction.
+
+
+        Parameters
+        ----------
+        key: Any
+            The key.
+        default: Any
+            The value to return if the key is not in the cache.
+            Defaults to ``None``.
+
+
+        Returns
+        -------
+        Any
+            The value, or ``default``.
+        """
+
+        i = hash(key) % len(self._shards)
+
+        with self._locks[i]:
+            return self._shards[i].peek(key, default)
+
+    def pop(
+        self: Self,
+        key: _K,
+        default: Any = MISSING,
+        /,
+    ) -> Any:
+        """
+        Removes a value from the cache and returns it.
+
+
+        Parameters
+        ----------
+        key: Any
+            The key.
+        default: Any
+            The value to return if the key is not in the cache.
+
+
+        Raises
+        ------
+        KeyError
+            The key is not in the cache and no default was given.
+
+
+        Returns
+        -------
+        Any
+            The value, or ``default``.
+        """
+
+        i = hash(key) % len(self._shards)
+
+        with self._locks[i]:
+            return self._shards[i].pop(key, default)
+
+    def get_or_set(
+        self: Self,
+        key: _K,
+        factory: Callable[[], _V],
+        /,
+    ) -> _V:
+        """
+        Gets a value from the cache, or creates and sets it if the key
+        is not in the cache.
+
+        The factory is called while holding the lock of the key's
+        shard, so it is called at most once per missing key.
+
+
+        Parameters
+        ----------
+        key: Any
+            The key.
+        factory: Callable[[], Any]
+            A callable which creates the value.
+
+
+        Returns
+        -------
+        Any
+            The value.
+        """
+
+        i = hash(key) % len(self._shards)
+
+        with self._locks[i]:
+            return self._shards[i].get_or_set(key, factory)
+
+    def _group(
+        self: Self,
+        items: Iterable[_T],
+        key: Callable[[_T], Any],
+        /,
+    ) -> dict[int, list[_T]]:
+        count = len(self._shards)
+        groups: dict[int, list[_T]] = dict()
+
+        for item in items:
+            try:
+                groups[hash(key(item)) % count].append(item)
+            except KeyError:
+                groups[hash(key(item)) % count] = [item]
+
+        return groups
+
+    def get_many(
+        self: Self,
+        keys: Iterable[_K],
+        /,
+    ) -> dict[_K, _V]:
+        """
+        Gets many values from the cache, counting a hit or a miss for
+        each key. Each shard's lock is taken once.
+
+
+        Parameters
+        ----------
+        keys: Iterable[Any]
+            The keys.
+
+
+        Returns
+        -------
+        dict[Any, Any]
+            The keys which are in the cache and their values.
+        """
+
+        values = dict()
+
+        for i, group in self._group(keys, _identity).items():
+            with self._locks[i]:
+                values.update(self._shards[i].get_many(group))
+
+        return values
+
+    def set_many(
+        self: Self,
+        items: Mapping[_K, _V] | Iterable[tuple[_K, _V]],
+        /,
+    ) -> None:
+        """
+        Sets many values in the cache. Each shard's lock is taken once
+        and each shard evicts once.
+
+
+        Parameters
+        ----------
+        items: Mapping[Any, Any] | Iterable[tuple[Any, Any]]
+            The keys and values.
+        """
+
+        pairs: Iterable[tuple[_K, _V]] = items.items() if isinstance(items, collections.abc.Mapping) else items  # type: ignore  # narrowing to Mapping loses the key and value types
+
+        for i, group in self._group(pairs, operator.itemgetter(0)).items():
+            with self._locks[i]:
+                self._shards[i].set_many(group)
+
+    def delete_many(
+        self: Self,
+        keys: Iterable[_K],
+        /,
+    ) -> int:
+        """
+        Removes many values from the cache, ignoring keys which are not
+        in the cache. Each shard's lock is taken once.
+
+
+        Parameters
+        ----------
+        keys: Iterable[Any]
+            The keys.
+
+
+        Returns
+        -------
+        :class:`int`
+            The number of values removed.
+        """
+
+        count = 0
+
+        for i, group in self._group(keys, _identity).items():
+            with self._locks[i]:
+                count += self._shards[i].delete_many(group)
+
+        return count
+
+    def _snapshot_entries(
+        self: Self,
+        /,
+    ) -> Iterator[tuple[_K, _V, Any]]:
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                entries = list(shard._snapshot_entries())
+
+            yield from entries
+
+    def _container_size(
+        self: Self,
+        /,
+    ) -> int:
+        return sys.getsizeof(self) + sys.getsizeof(self._shards) + sum(shard._container_size() for shard in self._shards)
+
+    def memory_usage(
+        self: Self,
+        /,
+        *,
+        sample: int | None = MISSING,
+        largest: int = MISSING,
+    ) -> dict[str, Any]:
+        sample = sample if sample is not MISSING else 1024
+        largest = largest if largest is not MISSING else 0
+
+        if sample is not None and sample < 1:
+            raise ValueError("sample must be None or a positive integer")
+
+        # NOTE: each shard is measured under its own lock, with the
+        #       sample split between the shards by their size
+        count = len(self)
+
+        reports = list()
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                reports.append(shard.memory_usage(sample=max(1, sample * len(shard) // count) if sample is not None and count else sample, largest=largest))
+
+        report: dict[str, Any] = {
+            "entries": sum(report["entries"] for report in reports),
+            "sampled": sum(report["sampled"] for report in reports),
+            "container": self._container_size(),
+            "keys": sum(report["keys"] for report in reports),
+            "values": sum(report["values"] for report in reports),
+        }
+
+        report["total"] = report["container"] + report["keys"] + report["values"]
+
+        if largest:
+            entries = itertools.chain.from_iterable(report["largest"] for report in reports)
+            report["largest"] = heapq.nlargest(largest, entries, key=operator.itemgetter("size"))
+
+        return report
+
+    @property
+    def shards(
+        self: Self,
+        /,
+    ) -> int:
+        return len(self._shards)
+
+    def clear(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Clears the cache.
+        """
+
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                shard.clear()
+
+    def reset(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Resets the cache.
+        """
+
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                shard.reset()
+
+
+class ConcurrentLRUCache(ConcurrentCache[_K, _V]):
+    """
+    TODO
+    """
+
+    __slots__ = ("_max_size",)
+
+    def __init__(
+        self: Self,
+        /,
+        *,
+        max_size: int,
+        shards: int = MISSING,
+    ) -> None:
+        shards = shards if shards is not MISSING else 16
+
+        if max_size < 0:
+            raise ValueError("max_size must be 0 or a positive integer")
+
+        self._max_size: int = max_size
+
+        # NOTE: recency is tracked per shard, so eviction is an
+        #       approximation of global LRU order
+        super().__init__(shards=max(1, min(shards, max_size)))
+
+    def _make_shard(
+        self: Self,
+        index: int,
+        count: int,
+        /,
+    ) -> Cache[_K, _V]:
+        size, remainder = divmod(self._max_size, count)
+
+        return LRUCache(max_size=size + (index < remainder))
+
+    @property
+    def max_size(
+        self: Self,
+        /,
+    ) -> int:
+        return self._max_size
+
+
+class SharedMemoryCache(Cache[_K, _V]):
+    """
+    TODO
+    """
+
+    # NOTE: an open-addressing hash table of 8 byte slots followed by an
+    #       append-only arena of records, all in one shared memory
+    #       segment. each slot holds the offset of its record, and each
+    #       record holds a stable hash of its key, its encoded key, and
+    #       its encoded value. str and bytes are stored raw, so that
+    #       reading them does not unpickle anything.
+    #
+    #       writers are serialized by a process-shared lock, and a
+    #       record is always fully written before the slot pointing to
+    #       it, so readers do not lock at all. arena space of replaced
+    #       and deleted records is reclaimed by compacting the arena and
+    #       rehashing the slots without their tombstones once a write
+    #       does not fit. compacting and clearing bump a generation
+    #       counter, odd while they run, that readers check to retry
+
+    __slots__ = ("_memory", "_buffer", "_slots", "_arena", "_lock")
+
+    def __init__(
+        self: Self,
+        /,
+        *,
+        size: int = MISSING,
+        slots: int = MISSING,
+        name: str | None = MISSING,
+        lock: Any = MISSING,
+    ) -> None:
+        size = size if size is not MISSING else 64 * 1024 * 1024
+        slots = slots if slots is not MISSING else 65536
+        name = name if name is not MISSING else None
+        lock = lock if lock is not MISSING else multiprocessing.Lock()
+
+        if slots < 1 or slots & (slots - 1):
+            raise ValueError("slots must be a positive power of two")
+
+        arena = _shm_header.size + slots * 8
+
+        if size <= arena:
+            raise ValueError(f"size must be greater than {arena} bytes for {slots} slots")
+
+        memory = multiprocessing.shared_memory.SharedMemory(name, create=True, size=size)
+
+        self._setup(memory, lock, (slots, size, arena))
+
+    def _setup(
+        self: Self,
+        memory: multiprocessing.shared_memory.SharedMemory,
+        lock: Any,
+        header: tuple[int, int, int] | None,
+        /,
+    ) -> None:
+        # NOTE: header is (slots, size, arena) for a new segment, which is
+        #       written before the header is read back and checked
+        buffer = memory.buf
+        assert buffer is not None  # only None once the segment is closed
+
+        if header is not None:
+            slots, size, arena = header
+            _shm_header.pack_into(buffer, 0, _shm_magic, _shm_version, slots, size, arena, arena, 0, 0)
+
+        magic, version, slots, _, arena, _, _, _ = _shm_header.unpack_from(buffer, 0)
+
+        if magic != _shm_magic or version != _shm_version:
+            memory.close()
+            raise ValueError(f"shared memory segment {memory.name!r} is not a cache")
+
+        self._memory: multiprocessing.shared_memory.SharedMemory = memory
+        self._buffer: memoryview = buffer
+        self._slots: int = slots
+        self._arena: int = arena
+        self._lock: Any = lock
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        _register_cache(self)
+
+    @classmethod
+    def attach(
+        cls: type[Self],
+        name: str,
+        /,
+        *,
+        lock: Any = None,
+    ) -> Self:
+        """
+        Attaches to a cache created in another process.
 
-    if wrapper is not MISSING:
+        Instances passed to child processes by :mod:`multiprocessing`
+        are attached automatically and share the creator's lock.
 
-        def decorator_wrapper(
-            wrapped: _GeneratorFunc[_P, _T],
-            /,
-        ) -> Callable[_P, _U]:
-            cache: Cache[int, _U] | None
 
-            if max_size == -1 or max_size is None:
-                cache = Cache()
-            else:
-                cache = LRUCache(max_size=max_size)
+        Parameters
+        ----------
+        name: :class:`str`
+            The name of the cache's shared memory segment.
+        lock: Any
+            A lock shared with every other writer, such as a
+            :func:`multiprocessing.Lock`. Without it, the cache is
+            read-only. Defaults to ``None``.
 
-            def inner(
-                *args: _P.args,
-                **kwargs: _P.kwargs,
-            ) -> _U:
-                key = _make_key(args, kwargs)
 
-                if key not in cache:
-                    cache[key] = wrapper(wrapped(*args, **kwargs))
+        Returns
+        -------
+        :class:`SharedMemoryCache`
+            The cache.
+        """
 
-                return cache[key]
+        if sys.version_info >= (3, 13):
+            # NOTE: otherwise the resource tracker of this process unlinks
+            #       the segment when it exits
+            memory = multiprocessing.shared_memory.SharedMemory(name, track=False)
+        else:
+            memory = multiprocessing.shared_memory.SharedMemory(name)
 
-            inner.__utility_cache__ = cache
+        self = cls.__new__(cls)
+        self._setup(memory, lock, None)
 
-            return inner
+        return self
 
-        return decorator_wrapper
+    def __reduce__(
+        self: Self,
+        /,
+    ) -> tuple[Any, ...]:
+        return (_attach_shared_memory_cache, (type(self), self._memory.name, self._lock))
 
-    else:
+    @property
+    def name(
+        self: Self,
+        /,
+    ) -> str:
+        return self._memory.name
 
-        def decorator(
-            wrapped: _GeneratorFunc[_P, _T],
-            /,
-        ) -> _GeneratorFunc[_P, _T]:
-            cache: Cache[int, tuple[Generator[_T, None, Any], list[_T], bool]]
+    @staticmethod
+    def _encode(
+        obj: Any,
+        /,
+    ) -> bytes:
+        cls = type(obj)
 
-            if max_size == -1 or max_size is None:
-                cache = Cache()
-            else:
-                cache = LRUCache(max_size=max_size)
+        if cls is str:
+            return b"s" + obj.encode("utf-8", "surrogatepass")
+        elif cls is bytes:
+            return b"b" + obj
+        else:
+            return b"p" + pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
 
-            def inner(
-                *args: _P.args,
-                **kwargs: _P.kwargs,
-            ) -> Generator[_T, None, Any]:
-                key = _make_key(args, kwargs)
+    @staticmethod
+    def _decode(
+        data: memoryview,
+        /,
+    ) -> Any:
+        tag = data[0]
 
-                if key not in cache:
-                    generator = wrapped(*args, **kwargs)
-                    cache[key] = (generator, list(), False)
+        if tag == 0x73:  # b"s"
+            return str(data[1:], "utf-8", "surrogatepass")
+        elif tag == 0x62:  # b"b"
+            return bytes(data[1:])
+        else:
+            return pickle.loads(data[1:])
 
-                generator, items, done = cache[key]
+    def _find(
+        self: Self,
+        data: bytes,
+        digest: int,
+        /,
+    ) -> tuple[int, int]:
+        # NOTE: returns the index of the key's slot and its record's
+        #       offset, or the index of the slot to insert it at and 0
+        buffer = self._buffer
+        mask = self._slots - 1
+        insert = -1
 
-                i = 0  # NOTE: this garbage is all required to support multiple entries before exit
-                while i < len(items):
-                    yield items[i]
-                    i += 1
+        i = digest & mask
+        for _ in range(self._slots):
+            (offset,) = _shm_offset.unpack_from(buffer, _shm_header.size + i * 8)
 
-                if not done:
-                    i = 0
-                    for item in generator:
-                        items.append(item)
-                        yield item
-                        i += 1
+            if offset == 0:
+                return (i if insert == -1 else insert), 0
 
-                        if cache[key][2]:
-                            yield from items[i:]
-                            return
+            if offset == 1:
+                if insert == -1:
+                    insert = i
+            else:
+                record_digest, key_length, _ = _shm_record.unpack_from(buffer, offset)
 
-                    cache[key] = (MISSING, items, True)
+                if record_digest == digest and key_length == len(data):
+                    start = offset + _shm_record.size
 
-            inner.__utility_cache__ = cache
+                    if buffer[start : start + key_length] == data:
+                        return i, offset
 
-            return inner
+            i = (i + 1) & mask
 
-        if wrapped is MISSING:
-            return decorator
+        return insert, 0
 
-        return decorator(wrapped)
+    def _lookup(
+        self: Self,
+        key: _K,
+        /,
+    ) -> Any:
+        data = self._encode(key)
+        digest = _shm_digest(data)
+        buffer = self._buffer
 
+        while True:
+            (generation,) = _shm_offset.unpack_from(buffer, _shm_generation)
 
-_K = TypeVar("_K")
-_V = TypeVar("_V")
+            if generation & 1:
+                time.sleep(0)
+                continue
 
+            try:
+                _, offset = self._find(data, digest)
 
-class Cache(Generic[_K, _V]):
-    """
-    TODO
-    """
+                if offset == 0:
+                    value = MISSING
+                else:
+                    _, key_length, value_length = _shm_record.unpack_from(buffer, offset)
+                    start = offset + _shm_record.size + key_length
+                    value = self._decode(buffer[start : start + value_length])
+            except Exception:
+                if _shm_offset.unpack_from(buffer, _shm_generation)[0] == generation:
+                    raise
 
-    __slots__ = ("_cache", "hits", "misses")
+                continue
 
-    def __init__(
+            if _shm_offset.unpack_from(buffer, _shm_generation)[0] == generation:
+                return value
+
+    def _check_writable(
         self: Self,
         /,
-    ) -> None:
-        self._cache: dict[_K, _V] = dict()
+    ) -> Any:
+        if self._lock is None:
+            raise TypeError("cache was attached without a lock and is read-only")
 
-        self.hits: int = 0
-        self.misses: int = 0
+        return self._lock
 
     def __contains__(
         self: Self,
         key: _K,
     ) -> bool:
-        return key in self._cache
+        return self._lookup(key) is not MISSING
 
     def __delitem__(
         self: Self,
         key: _K,
         /,
     ) -> None:
-        try:
-            del self._cache[key]
-        except KeyError:
-            raise
+        data = self._encode(key)
+        digest = _shm_digest(data)
+
+        with self._check_writable():
+            i, offset = self._find(data, digest)
+
+            if offset == 0:
+                raise KeyError(key)
+
+            _shm_offset.pack_into(self._buffer, _shm_header.size + i * 8, 1)
+            _shm_offset.pack_into(self._buffer, _shm_count, len(self) - 1)
 
     def __getitem__(
         self: Self,
         key: _K,
         /,
     ) -> _V:
-        try:
-            value = self._cache[key]
-        except KeyError:
+        value = self._lookup(key)
+
+        if value is MISSING:
             self.misses += 1
-            raise
-        else:
-            self.hits += 1
-            return value
+            raise KeyError(key)
+
+        self.hits += 1
+        return value
 
     def __setitem__(
         self: Self,
@@ -200,120 +4239,454 @@ class Cache(Generic[_K, _V]):
         value: _V,
         /,
     ) -> None:
-        self._cache[key] = value
+        data = self._encode(key)
+        digest = _shm_digest(data)
+        encoded = self._encode(value)
+
+        length = _shm_record.size + len(data) + len(encoded)
+        length += -length % 8
+
+        buffer = self._buffer
+
+        with self._check_writable():
+            i, offset = self._find(data, digest)
+            (head,) = _shm_offset.unpack_from(buffer, _shm_head)
+
+            if i == -1 or head + length > len(buffer):
+                self._compact()
+
+                i, offset = self._find(data, digest)
+                (head,) = _shm_offset.unpack_from(buffer, _shm_head)
+
+            # NOTE: probes get long well before the table is completely
+            #       full, so new keys are refused at 3/4 of the slots
+            if i == -1 or (offset == 0 and len(self) >= self._slots - self._slots // 4):
+                raise MemoryError("shared memory cache has no free slots")
+
+            if head + length > len(buffer):
+                raise MemoryError("shared memory cache arena is full")
+
+            start = head + _shm_record.size
+            _shm_record.pack_into(buffer, head, digest, len(data), len(encoded))
+            buffer[start : start + len(data)] = data
+            buffer[start + len(data) : start + len(data) + len(encoded)] = encoded
+
+            _shm_offset.pack_into(buffer, _shm_head, head + length)
+            _shm_offset.pack_into(buffer, _shm_header.size + i * 8, head)
+
+            if offset == 0:
+                _shm_offset.pack_into(buffer, _shm_count, len(self) + 1)
+
+    def _compact(
+        self: Self,
+        /,
+    ) -> None:
+        # NOTE: must be called with the lock held. live records are copied
+        #       to the front of the arena in slot order and rehashed into
+        #       an empty table, which drops every tombstone
+        buffer = self._buffer
+        mask = self._slots - 1
+
+        slots = bytearray(self._slots * 8)
+        arena = bytearray()
+
+        for i in range(self._slots):
+            (offset,) = _shm_offset.unpack_from(buffer, _shm_header.size + i * 8)
+
+            if offset > 1:
+                digest, key_length, value_length = _shm_record.unpack_from(buffer, offset)
+
+                length = _shm_record.size + key_length + value_length
+                length += -length % 8
+
+                j = digest & mask
+                while _shm_offset.unpack_from(slots, j * 8)[0]:
+                    j = (j + 1) & mask
+
+                _shm_offset.pack_into(slots, j * 8, self._arena + len(arena))
+                arena += buffer[offset : offset + length]
+
+        (generation,) = _shm_offset.unpack_from(buffer, _shm_generation)
+        _shm_offset.pack_into(buffer, _shm_generation, generation + 1)
+
+        buffer[_shm_header.size : self._arena] = slots
+        buffer[self._arena : self._arena + len(arena)] = arena
+        _shm_offset.pack_into(buffer, _shm_head, self._arena + len(arena))
+
+        _shm_offset.pack_into(buffer, _shm_generation, generation + 2)
 
     def __len__(
         self: Self,
         /,
     ) -> int:
-        return len(self._cache)
+        return _shm_offset.unpack_from(self._buffer, _shm_count)[0]
 
     @property
-    def size(
+    def slots(
         self: Self,
         /,
     ) -> int:
-        return len(self)
+        return self._slots
+
+    @property
+    def arena_used(
+        self: Self,
+        /,
+    ) -> int:
+        return _shm_offset.unpack_from(self._buffer, _shm_head)[0] - self._arena
+
+    @property
+    def arena_size(
+        self: Self,
+        /,
+    ) -> int:
+        return len(self._buffer) - self._arena
+
+    def peek(
+        self: Self,
+        key: _K,
+        default: Any = None,
+        /,
+    ) -> Any:
+        value = self._lookup(key)
+
+        return value if value is not MISSING else default
+
+    def memory_usage(
+        self: Self,
+        /,
+        *,
+        sample: int | None = MISSING,
+        largest: int = MISSING,
+    ) -> dict[str, Any]:
+        # NOTE: entries are stored serialized, so the arena is exact and
+        #       nothing needs to be sampled, except for largest
+        largest = largest if largest is not MISSING else 0
+
+        used = self.arena_used
+
+        report: dict[str, Any] = {
+            "entries": len(self),
+            "sampled": 0,
+            "container": len(self._buffer),
+            "keys": 0,
+            "values": used,
+            "total": len(self._buffer),
+        }
+
+        if largest:
+            buffer = self._buffer
+            top: list[tuple[int, int, int]] = list()
+
+            for i in range(self._slots):
+                (offset,) = _shm_offset.unpack_from(buffer, _shm_header.size + i * 8)
+
+                if offset > 1:
+                    _, key_length, value_length = _shm_record.unpack_from(buffer, offset)
+                    item = (_shm_record.size + key_length + value_length, i, offset)
+
+                    if len(top) < largest:
+                        heapq.heappush(top, item)
+                    else:
+                        heapq.heappushpop(top, item)
+
+            report["largest"] = list()
+
+            for size, _, offset in sorted(top, reverse=True):
+                _, key_length, _ = _shm_record.unpack_from(buffer, offset)
+                start = offset + _shm_record.size
+                report["largest"].append({"key": self._decode(buffer[start : start + key_length]), "size": size})
+
+        return report
+
+    def _snapshot_entries(
+        self: Self,
+        /,
+    ) -> Iterator[tuple[_K, _V, Any]]:
+        buffer = self._buffer
+
+        for i in range(self._slots):
+            (offset,) = _shm_offset.unpack_from(buffer, _shm_header.size + i * 8)
+
+            if offset > 1:
+                _, key_length, value_length = _shm_record.unpack_from(buffer, offset)
+                start = offset + _shm_record.size
+
+                yield self._decode(buffer[start : start + key_length]), self._decode(buffer[start + key_length : start + key_length + value_length]), None
 
     def clear(
         self: Self,
         /,
     ) -> None:
         """
-        Clears the cache.
+        Clears the cache, reclaiming its whole arena.
         """
 
-        self._cache.clear()
+        buffer = self._buffer
 
-    def reset(
+        with self._check_writable():
+            (generation,) = _shm_offset.unpack_from(buffer, _shm_generation)
+            _shm_offset.pack_into(buffer, _shm_generation, generation + 1)
+
+            buffer[_shm_header.size : self._arena] = bytes(self._arena - _shm_header.size)
+            _shm_offset.pack_into(buffer, _shm_count, 0)
+            _shm_offset.pack_into(buffer, _shm_head, self._arena)
+
+            _shm_offset.pack_into(buffer, _shm_generation, generation + 2)
+
+    def close(
         self: Self,
         /,
     ) -> None:
         """
-        Resets the cache.
+        Detaches this process from the cache. The cache must not be
+        used afterwards.
         """
 
-        self.clear()
+        self._buffer.release()
+        self._memory.close()
 
-        self.hits = 0
-        self.misses = 0
+    def unlink(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Destroys the cache's shared memory segment once every process
+        has closed it. Should be called once, by the creator.
+        """
 
+        self._memory.unlink()
 
-class SizedCache(Cache[_K, _V]):
+
+_shm_magic = b"UTILSHM\x00"
+_shm_version = 1
+_shm_header = struct.Struct("<8sQQQQQQQ")  # magic, version, slots, size, arena, head, count, generation
+_shm_head = 40
+_shm_count = 48
+_shm_generation = 56
+_shm_offset = struct.Struct("<Q")
+_shm_record = struct.Struct("<QII")  # digest, key length, value length
+
+
+def _shm_digest(
+    data: bytes,
+    /,
+) -> int:
+    # NOTE: hash() of str and bytes is salted per process
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def _attach_shared_memory_cache(
+    cls: type[SharedMemoryCache[Any, Any]],
+    name: str,
+    lock: Any,
+    /,
+) -> SharedMemoryCache[Any, Any]:
+    return cls.attach(name, lock=lock)
+
+
+class DiskStore:
     """
     TODO
     """
 
-    __slots__ = ("_max_size",)
+    # NOTE: a persistent mapping of bytes keys to pickled values in a
+    #       sqlite database in WAL mode, so that any number of processes
+    #       can read while one writes. connections are opened lazily per
+    #       process, since a sqlite connection must not cross a fork.
+    #       nothing is ever evicted or expired, the file grows until it is
+    #       cleared
+
+    __slots__ = ("_path", "_connection", "_pid", "_lock")
+
+    version: int = 1
+    """
+    The version of the file format, stored as the database's
+    user_version. Files written with another version are cleared on
+    open.
+    """
 
     def __init__(
         self: Self,
+        path: str | os.PathLike[str],
         /,
-        *,
-        max_size: int,
     ) -> None:
-        self._max_size: int = MISSING
-
-        self.max_size = max_size
+        self._path: str = os.fspath(path)
+        self._connection: sqlite3.Connection | None = None
+        self._pid: int = 0
+        self._lock: threading.Lock = threading.Lock()
 
     @property
-    def max_size(
+    def path(
+        self: Self,
+        /,
+    ) -> str:
+        return self._path
+
+    def _connect(
+        self: Self,
+        /,
+    ) -> sqlite3.Connection:
+        connection = self._connection
+
+        if connection is not None and self._pid == os.getpid():
+            return connection
+
+        connection = sqlite3.connect(self._path, timeout=30, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+
+            (version,) = connection.execute("PRAGMA user_version").fetchone()
+
+            if version != self.version:
+                connection.execute("DROP TABLE IF EXISTS entries")
+                connection.execute(f"PRAGMA user_version={self.version:d}")
+
+            connection.execute("CREATE TABLE IF NOT EXISTS entries (key BLOB PRIMARY KEY, value BLOB NOT NULL) WITHOUT ROWID")
+
+        self._connection = connection
+        self._pid = os.getpid()
+
+        return connection
+
+    def __contains__(
+        self: Self,
+        key: bytes,
+    ) -> bool:
+        with self._lock:
+            return self._connect().execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(
         self: Self,
         /,
     ) -> int:
-        return self._max_size
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
 
-    @max_size.setter
-    def max_size(
+    def get(
         self: Self,
-        value: int,
+        key: bytes,
         /,
-    ) -> None:
-        if value < 0:
-            raise ValueError("max_size must be 0 or a positive integer")
+    ) -> Any:
+        """
+        Gets a value from the store.
 
-        self._max_size = value
 
+        Parameters
+        ----------
+        key: :class:`bytes`
+            The key.
 
-class LRUCache(SizedCache[_K, _V]):
-    """
-    TODO
-    """
 
-    __slots__ = ()
+        Returns
+        -------
+        Any
+            The value, or :data:`MISSING` if the key is not in the
+            store or its value can no longer be unpickled.
+        """
 
-    def __init__(
+        with self._lock:
+            row = self._connect().execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+
+        if row is None:
+            return MISSING
+
+        try:
+            return pickle.loads(row[0])
+        except Exception:
+            return MISSING
+
+    def set(
         self: Self,
+        key: bytes,
+        value: Any,
         /,
-        *,
-        max_size: int,
-    ) -> None:
-        super().__init__(max_size=max_size)
+    ) -> bool:
+        """
+        Sets a value in the store.
 
-        self._cache: OrderedDict[_K, _V] = collections.OrderedDict()
 
-    def __getitem__(self, key: _K) -> _V:
+        Parameters
+        ----------
+        key: :class:`bytes`
+            The key.
+        value: Any
+            The value.
+
+
+        Returns
+        -------
+        :class:`bool`
+            Whether the value could be pickled and was stored.
+        """
+
         try:
-            value = super().__getitem__(key)
-        except KeyError:
-            raise
-        else:
-            self._cache.move_to_end(key)
-            return value
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
 
-    def __setitem__(self, key: _K, value: _V) -> None:
-        if key in self._cache.keys():
-            self._cache.move_to_end(key)
+        with self._lock:
+            self._connect().execute("INSERT OR REPLACE INTO entries (key, value) VALUES (?, ?)", (key, data))
 
-        super().__setitem__(key, value)
+        return True
+
+    def delete(
+        self: Self,
+        key: bytes,
+        /,
+    ) -> None:
+        """
+        Deletes a value from the store, if it exists.
+        """
+
+        with self._lock:
+            self._connect().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Clears the store.
+        """
+
+        with self._lock:
+            self._connect().execute("DELETE FROM entries")
+
+    def close(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Closes the store's connection. It is reopened on next use.
+        """
+
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
 
-        while len(self._cache) > self.max_size:
-            self._cache.popitem(last=False)
+            self._connection = None
 
 
 __all__ = [
+    "cache_async_generator",
+    "cache_coroutine",
     "cache_generator",
+    "cache_method",
+    "format_cache_statistics",
+    "get_cache_statistics",
+    "register_cache",
     "Cache",
     "SizedCache",
     "LRUCache",
+    "LFUCache",
+    "TinyLFUCache",
+    "TTLCache",
+    "ConcurrentCache",
+    "ConcurrentLRUCache",
+    "SharedMemoryCache",
+    "DiskStore",
 ]
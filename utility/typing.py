@@ -29,6 +29,9 @@ class _MissingSentinel:
     def __bool__(self) -> bool:
         return False
 
+    def __reduce__(self) -> str:
+        return "MISSING"
+
 
 MISSING: Any = _MissingSentinel()
 """